@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+_DONE = object()  # Returned by next() when a summary generator is exhausted
+
+
+class AsyncPDFSummarizer:
+    """
+    An asyncio facade over PDFSummarizer for embedding in async services.
+
+    Extraction and inference run in executor threads. The number of documents
+    summarized at once is limited per model, however many facades share it.
+    """
+
+    # Semaphores are bound to an event loop, so they are kept per loop and dropped with it
+    _model_semaphores = weakref.WeakKeyDictionary()
+    _model_semaphores_lock = threading.Lock()
+
+    def __init__(self, summarizer, max_concurrency=1, executor=None):
+        """
+        Initializes the AsyncPDFSummarizer.
+
+        :param summarizer: A loaded PDFSummarizer.
+        :param max_concurrency: The maximum number of documents summarized at once with this model.
+            The first facade to use a model in an event loop sets the limit.
+        :param executor: Optional executor driving the blocking generators. Defaults to a private thread pool.
+        """
+        self.summarizer = summarizer
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max(1, max_concurrency), thread_name_prefix="async-summarizer")
+        self.max_concurrency = max(1, max_concurrency)
+
+    def _model_semaphore(self):
+        """
+        Returns the semaphore shared by all facades of the same model in the running event loop.
+
+        :return: An asyncio.Semaphore.
+        """
+        key = (self.summarizer.model_path, self.summarizer.model_variant)
+        loop = asyncio.get_running_loop()
+        with self._model_semaphores_lock:
+            semaphores = self._model_semaphores.setdefault(loop, {})
+            if key not in semaphores:
+                semaphores[key] = asyncio.Semaphore(self.max_concurrency)
+            return semaphores[key]
+
+    async def _iterate(self, generator):
+        """
+        Drives a blocking generator from executor threads.
+
+        If the consumer stops or is cancelled, the generator is closed, which stops
+        its extraction and cancels its inference work that has not started yet.
+
+        :param generator: A generator from PDFSummarizer.
+        :yield: The items of the generator.
+        """
+        future = None
+        try:
+            async with self._model_semaphore():
+                while True:
+                    future = self.executor.submit(next, generator, _DONE)
+                    item = await asyncio.wrap_future(future)
+                    if item is _DONE:
+                        break
+                    yield item
+        finally:
+            if future is not None and not future.done():
+                # A generator cannot be closed while next() is still running in a worker thread
+                future.add_done_callback(lambda _: generator.close())
+            else:
+                generator.close()
+
+    def iter_file_summaries(self, file_path, summary_length='medium'):
+        """
+        Summarizes a file (PDF, DOCX, TXT), yielding each chunk summary as soon as it is ready.
+
+        :param file_path: The path to the file to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: An async iterator over summarized chunks of text.
+        """
+        return self._iterate(self.summarizer.summarize_file_incrementally(file_path, summary_length))
+
+    def iter_text_summaries(self, text, summary_length='medium'):
+        """
+        Summarizes text, yielding each chunk summary as soon as it is ready.
+
+        :param text: The text to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: An async iterator over summarized chunks of text.
+        """
+        return self._iterate(self.summarizer.summarize_text_incrementally_generator(text, summary_length))
+
+    async def summarize_file(self, file_path, summary_length='medium'):
+        """
+        Summarizes a file (PDF, DOCX, TXT).
+
+        :param file_path: The path to the file to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: A list of summarized chunks of text.
+        """
+        return [summary async for summary in self.iter_file_summaries(file_path, summary_length)]
+
+    async def summarize_text(self, text, summary_length='medium'):
+        """
+        Summarizes text.
+
+        :param text: The text to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: A list of summarized chunks of text.
+        """
+        return [summary async for summary in self.iter_text_summaries(text, summary_length)]
+
+    def close(self):
+        """
+        Shuts down the executor driving the generators, unless it was passed in.
+        """
+        if self.owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
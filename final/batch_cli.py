@@ -0,0 +1,206 @@
+"""
+Headless batch summarization of a directory tree.
+
+Files are spread across worker processes that each load the model once.
+Every finished file is recorded in a JSONL manifest, so a rerun after a
+crash skips the files that are already done.
+
+Usage:
+    python batch_cli.py <input dir> <output dir> [--workers 4] [--summary-length medium] [--model model]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from document_reader import SUPPORTED_FILE_TYPES, get_file_type
+from progress import ProgressTracker, format_duration
+
+MANIFEST_FILE = '.summaries_manifest.jsonl'
+
+_summarizer = None  # The PDFSummarizer of the current worker process
+
+
+def init_worker(summarizer_options, torch_threads):
+    """
+    Loads the model once per worker process.
+
+    :param summarizer_options: Keyword arguments for PDFSummarizer.
+    :param torch_threads: The number of intra-op threads torch may use in this worker.
+    """
+    global _summarizer
+    import torch
+    from pdf_summariser_class import PDFSummarizer
+
+    # Workers share the CPU, so each one gets its own slice of the cores
+    torch.set_num_threads(torch_threads)
+    _summarizer = PDFSummarizer(**summarizer_options)
+
+
+def summarize_to_file(source_path, output_path, summary_length, correct_grammar=False):
+    """
+    Summarizes one file and writes the summary. Runs inside a worker process.
+
+    :param source_path: The file to summarize.
+    :param output_path: The summary file to write.
+    :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+    :param correct_grammar: Whether to correct the grammar of each summary.
+    :return: The number of summarized chunks written.
+    :raises RuntimeError: If the file cannot be read or a chunk could not be summarized, so it is not recorded as done.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    temp_path = output_path + '.part'
+    chunks = 0
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for summary in _summarizer.summarize_file_incrementally(source_path, summary_length, correct_grammar=correct_grammar):
+            if summary.startswith("Error reading file:"):
+                raise RuntimeError(summary)
+            if not summary.strip():
+                # Inference errors come back as empty summaries; a rerun should try the file again
+                raise RuntimeError(f"Chunk {chunks + 1} could not be summarized")
+            f.write(summary + "\n")
+            chunks += 1
+    # Only complete summaries ever appear under the final name
+    os.replace(temp_path, output_path)
+    return chunks
+
+
+def find_documents(input_dir, exclude_dir=None):
+    """
+    Finds all supported documents below a directory.
+
+    :param input_dir: The directory to search.
+    :param exclude_dir: Optional directory to skip, e.g. an output directory inside input_dir.
+    :return: A sorted list of document paths relative to input_dir.
+    """
+    exclude_dir = os.path.abspath(exclude_dir) if exclude_dir else None
+    documents = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = [name for name in dirs if os.path.abspath(os.path.join(root, name)) != exclude_dir]
+        for name in files:
+            if get_file_type(name) in SUPPORTED_FILE_TYPES:
+                documents.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return sorted(documents)
+
+
+def file_signature(file_path):
+    """
+    Identifies the version of a file for the manifest.
+
+    :param file_path: The path to the file.
+    :return: A (size, mtime) tuple.
+    """
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime
+
+
+def load_manifest(manifest_path):
+    """
+    Loads the files recorded as finished.
+
+    :param manifest_path: The path of the JSONL manifest.
+    :return: A dictionary of relative paths to their (size, mtime) when they were summarized.
+    """
+    finished = {}
+    if not os.path.exists(manifest_path):
+        return finished
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by a crash
+            finished[record['path']] = (record['size'], record['mtime'])
+    return finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize every PDF, DOCX and TXT file in a directory tree.")
+    parser.add_argument('input_dir', help="Directory tree of documents to summarize.")
+    parser.add_argument('output_dir', help="Directory receiving one .summary.txt per document.")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Number of worker processes, each loading the model once.")
+    parser.add_argument('--summary-length', default='medium', choices=['small', 'medium', 'large'])
+    parser.add_argument('--model', default='model', help="Model directory.")
+    parser.add_argument('--batch-size', type=int, default=1, help="Chunks per generate call.")
+    parser.add_argument('--cache-dir', help="Optional directory for the persistent summary cache.")
+    parser.add_argument('--quantize', action='store_true', help="Use the dynamic int8 model.")
+    parser.add_argument('--backend', default='torch', choices=['torch', 'onnx'])
+    parser.add_argument('--extractive-ratio', type=float,
+                        help="Only send this fraction of each document's best ranked sentences to the model.")
+    parser.add_argument('--extractive-max-tokens', type=int,
+                        help="Only send this many input tokens of each document to the model.")
+    parser.add_argument('--ocr', action='store_true', help="OCR scanned PDF pages.")
+    parser.add_argument('--ocr-dpi', type=int, default=200, help="Resolution scanned pages are rendered at.")
+    parser.add_argument('--correct-grammar', action='store_true', help="Correct the grammar of each summary.")
+    parser.add_argument('--grammar-server', help="URL of a LanguageTool server shared by all workers.")
+    parser.add_argument('--manifest', help=f"Path of the progress manifest. Defaults to <output dir>/{MANIFEST_FILE}.")
+    args = parser.parse_args()
+
+    manifest_path = args.manifest or os.path.join(args.output_dir, MANIFEST_FILE)
+    os.makedirs(args.output_dir, exist_ok=True)
+    finished = load_manifest(manifest_path)
+
+    pending = []
+    for relative_path in find_documents(args.input_dir, args.output_dir):
+        source_path = os.path.join(args.input_dir, relative_path)
+        if finished.get(relative_path) == file_signature(source_path):
+            continue
+        pending.append(relative_path)
+    print(f"{len(pending)} files to summarize, {len(finished)} already done.")
+    if not pending:
+        return 0
+
+    summarizer_options = {
+        'model_name': args.model,
+        'batch_size': args.batch_size,
+        'cache_dir': args.cache_dir,
+        'quantize': args.quantize,
+        'backend': args.backend,
+        'grammar_server': args.grammar_server,
+        'extractive_ratio': args.extractive_ratio,
+        'extractive_max_tokens': args.extractive_max_tokens,
+        'ocr': args.ocr,
+        'ocr_dpi': args.ocr_dpi,
+    }
+    torch_threads = max(1, (os.cpu_count() or 1) // args.workers)
+    # Each worker OCRs with its own share of the cores, and its torch threads already use them all for inference
+    summarizer_options['ocr_workers'] = torch_threads
+    summarizer_options['inference_workers'] = 1
+
+    failures = 0
+    tracker = ProgressTracker(len(pending), unit_name="files")
+    with ProcessPoolExecutor(args.workers, initializer=init_worker, initargs=(summarizer_options, torch_threads)) as executor, \
+            open(manifest_path, 'a', encoding='utf-8') as manifest:
+        futures = {}
+        for relative_path in pending:
+            source_path = os.path.join(args.input_dir, relative_path)
+            output_path = os.path.join(args.output_dir, relative_path + '.summary.txt')
+            future = executor.submit(summarize_to_file, source_path, output_path, args.summary_length,
+                                     args.correct_grammar)
+            futures[future] = (relative_path, file_signature(source_path))
+
+        for future in as_completed(futures):
+            relative_path, (size, mtime) = futures[future]
+            try:
+                chunks = future.result()
+            except Exception as e:
+                failures += 1
+                tracker.advance(units=1)
+                print(f"Failed {relative_path}: {e} | {tracker.format()}")
+                continue
+            manifest.write(json.dumps({'path': relative_path, 'size': size, 'mtime': mtime, 'chunks': chunks}) + "\n")
+            manifest.flush()
+            tracker.advance(units=1, chunks=chunks)
+            print(f"{relative_path}: {chunks} chunks | {tracker.format()}")
+
+    elapsed = tracker.snapshot()['elapsed_seconds']
+    print(f"Finished in {format_duration(elapsed)} with {failures} failures.")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Benchmarks the summarization pipeline on a synthetic corpus with a tiny local model.
+
+The corpus and model are generated offline by benchmark_corpus. Each file type is
+benchmarked in its own process, so peak RSS is measured independently, and reports
+documents/s, chunks/s, peak RSS and latency percentiles per document and per stage.
+A saved baseline turns the run into a regression check.
+
+Usage:
+    python benchmark.py [--work-dir benchmark_data] [--documents 4] [--pages 5] [--layout single]
+                        [--save-baseline baseline.json] [--compare baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmark_corpus import LAYOUTS, build_corpus, build_tiny_model
+from compare_quantization import peak_rss_mb, run_in_child
+from instrumentation import latency_percentiles
+
+FILE_TYPES = ('pdf', 'docx', 'txt')
+# Higher is better for throughput, lower is better for everything else
+THROUGHPUT_METRICS = ('docs_per_second', 'chunks_per_second')
+
+
+def run_scenario(model_path, documents, options):
+    """
+    Summarizes a set of documents and measures the run. Runs in a child process.
+
+    :param model_path: The model directory.
+    :param documents: The paths of the documents to summarize.
+    :param options: The PDFSummarizer options and summary_length.
+    :return: The measurements of the run.
+    """
+    from pdf_summariser_class import PDFSummarizer
+
+    options = dict(options)
+    summary_length = options.pop('summary_length')
+    with PDFSummarizer(model_name=model_path, **options) as summarizer:
+        # Warm up once so one-off costs (lazy imports, first allocations) are not measured
+        list(summarizer.summarize_file_incrementally(documents[0], summary_length))
+        summarizer.metrics.keep_samples = True
+        summarizer.reset_metrics()
+
+        latencies = []
+        chunks = 0
+        run_start = time.perf_counter()
+        for file_path in documents:
+            start = time.perf_counter()
+            chunks += len(list(summarizer.summarize_file_incrementally(file_path, summary_length)))
+            latencies.append(time.perf_counter() - start)
+        run_seconds = time.perf_counter() - run_start
+        report = summarizer.metrics_report()
+
+    return {
+        'documents': len(documents),
+        'chunks': chunks,
+        'run_seconds': round(run_seconds, 3),
+        'docs_per_second': round(len(documents) / run_seconds, 3) if run_seconds else None,
+        'chunks_per_second': round(chunks / run_seconds, 3) if run_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'document_latency': latency_percentiles(latencies),
+        'stages': report['stages'],
+        'counters': report['counters'],
+    }
+
+
+def run_benchmark(model_path, corpus, options):
+    """
+    Benchmarks each file type of the corpus in its own process.
+
+    :param model_path: The model directory.
+    :param corpus: A dictionary mapping each file type to its document paths.
+    :param options: The PDFSummarizer options and summary_length.
+    :return: A dictionary mapping each file type to its measurements.
+    """
+    scenarios = {}
+    for file_type, documents in corpus.items():
+        print(f"Benchmarking {len(documents)} {file_type.upper()} documents...")
+        # A child that dies raises here, so a regression check fails instead of hanging
+        scenarios[file_type] = run_in_child(run_scenario, model_path, documents, options)
+    return scenarios
+
+
+def compare_to_baseline(scenarios, baseline, tolerance):
+    """
+    Finds measurements that regressed against a baseline by more than the tolerance.
+
+    :param scenarios: The measurements of this run.
+    :param baseline: The measurements of the baseline run.
+    :param tolerance: The allowed relative change, e.g. 0.25 for 25%.
+    :return: A list of regression descriptions.
+    """
+    regressions = []
+
+    def check(name, current, previous, higher_is_better=False):
+        if current is None or not previous:
+            return
+        change = (current - previous) / previous
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{name}: {previous} -> {current} ({change:+.0%})")
+
+    for file_type, previous in baseline.items():
+        current = scenarios.get(file_type)
+        if current is None:
+            continue
+        for metric in THROUGHPUT_METRICS:
+            check(f"{file_type} {metric}", current[metric], previous[metric], higher_is_better=True)
+        check(f"{file_type} peak_rss_mb", current['peak_rss_mb'], previous['peak_rss_mb'])
+        check(f"{file_type} document p90", current['document_latency'].get('p90_seconds'),
+              previous['document_latency'].get('p90_seconds'))
+        for stage, timings in previous['stages'].items():
+            if stage in current['stages']:
+                check(f"{file_type} {stage} p90", current['stages'][stage].get('p90_seconds'), timings.get('p90_seconds'))
+    return regressions
+
+
+def print_report(scenarios):
+    """
+    Prints a summary of the measurements.
+
+    :param scenarios: A dictionary mapping each file type to its measurements.
+    """
+    for file_type, result in scenarios.items():
+        latency = result['document_latency']
+        print(f"{file_type}: {result['docs_per_second']} docs/s, {result['chunks_per_second']} chunks/s, "
+              f"peak RSS {result['peak_rss_mb']} MB, document p50 {latency.get('p50_seconds')}s "
+              f"p90 {latency.get('p90_seconds')}s p99 {latency.get('p99_seconds')}s")
+        for stage, timings in result['stages'].items():
+            print(f"    {stage:<20} {timings['count']:>6} calls, p50 {timings.get('p50_seconds')}s, "
+                  f"p90 {timings.get('p90_seconds')}s, p99 {timings.get('p99_seconds')}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the summarization pipeline offline.")
+    parser.add_argument('--work-dir', default='benchmark_data', help="Folder for the synthetic corpus and tiny model.")
+    parser.add_argument('--model', help="Model directory to benchmark instead of the generated tiny model.")
+    parser.add_argument('--file-types', nargs='+', default=list(FILE_TYPES), choices=FILE_TYPES)
+    parser.add_argument('--documents', type=int, default=4, help="Documents per file type.")
+    parser.add_argument('--pages', type=int, default=5, help="Pages per document.")
+    parser.add_argument('--words-per-page', type=int, default=350)
+    parser.add_argument('--layout', default='single', choices=LAYOUTS, help="PDF page layout.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--summary-length', default='small', choices=['small', 'medium', 'large'])
+    parser.add_argument('--batch-size', type=int, default=1, help="Chunks per generate call.")
+    parser.add_argument('--extraction-workers', type=int, default=0, help="PDF extraction processes.")
+    parser.add_argument('--output', help="Optional path of a JSON report.")
+    parser.add_argument('--save-baseline', help="Save this run as the baseline at the given path.")
+    parser.add_argument('--compare', help="Baseline to compare against. Exits with status 1 on a regression.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative regression.")
+    args = parser.parse_args()
+
+    corpus = build_corpus(os.path.join(args.work_dir, 'corpus'), args.file_types, args.documents, args.pages,
+                          args.words_per_page, args.layout, args.seed)
+    model_path = os.path.abspath(args.model or build_tiny_model(os.path.join(args.work_dir, 'tiny_model'), args.seed))
+    options = {'summary_length': args.summary_length, 'batch_size': args.batch_size,
+               'extraction_workers': args.extraction_workers}
+
+    scenarios = run_benchmark(model_path, corpus, options)
+    print_report(scenarios)
+
+    report = {
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpu_count': os.cpu_count()},
+        'config': {'model': args.model or 'tiny', 'documents': args.documents, 'pages': args.pages,
+                   'words_per_page': args.words_per_page, 'layout': args.layout, 'seed': args.seed, **options},
+        'scenarios': scenarios,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['config'] != report['config']:
+            print("Warning: the baseline was recorded with different options.")
+        regressions = compare_to_baseline(scenarios, baseline['scenarios'], args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == '__main__':
+    main()
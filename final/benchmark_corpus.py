@@ -0,0 +1,232 @@
+"""
+Builds the offline inputs of the benchmark suite: synthetic PDF, DOCX and TXT
+documents of controlled size and layout, and a tiny randomly initialized
+seq2seq model with its own tokenizer. Nothing is downloaded.
+
+Everything is generated from a seed, so the same options always produce the same corpus.
+"""
+import json
+import os
+import random
+from textwrap import wrap
+
+from report_writer import wrap_text
+
+SYLLABLES = ["ka", "lo", "mi", "ren", "to", "sa", "vel", "dor", "in", "qua", "ber", "on", "tis", "ma", "ph", "ul"]
+LAYOUTS = ('single', 'columns')
+TINY_MODEL_MAX_POSITIONS = 256
+
+
+class TextGenerator:
+    """
+    Generates deterministic pseudo-English sentences from a fixed vocabulary.
+    """
+
+    def __init__(self, seed=0, vocabulary_size=600):
+        """
+        Initializes the TextGenerator.
+
+        :param seed: The random seed.
+        :param vocabulary_size: The number of distinct words.
+        """
+        self.random = random.Random(seed)
+        words = set()
+        while len(words) < vocabulary_size:
+            words.add("".join(self.random.choice(SYLLABLES) for _ in range(self.random.randint(1, 4))))
+        self.words = sorted(words)
+
+    def sentence(self):
+        """
+        Generates a sentence.
+
+        :return: A sentence of 8 to 24 words ending with a full stop.
+        """
+        words = self.random.choices(self.words, k=self.random.randint(8, 24))
+        return " ".join(words).capitalize() + "."
+
+    def paragraph(self, words):
+        """
+        Generates a paragraph.
+
+        :param words: The approximate number of words.
+        :return: A paragraph of whole sentences.
+        """
+        sentences = []
+        count = 0
+        while count < words:
+            sentence = self.sentence()
+            sentences.append(sentence)
+            count += len(sentence.split())
+        return " ".join(sentences)
+
+    def page(self, words, words_per_paragraph=80):
+        """
+        Generates the paragraphs of a page.
+
+        :param words: The approximate number of words on the page.
+        :param words_per_paragraph: The approximate number of words per paragraph.
+        :return: A list of paragraphs.
+        """
+        return [self.paragraph(words_per_paragraph) for _ in range(max(1, words // words_per_paragraph))]
+
+
+def write_txt(file_path, pages):
+    """
+    Writes pages of paragraphs as a TXT file with blank lines between paragraphs.
+
+    :param file_path: The path of the TXT file.
+    :param pages: A list of pages, each a list of paragraphs.
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for paragraphs in pages:
+            for paragraph in paragraphs:
+                f.write("\n".join(wrap(paragraph, 80)) + "\n\n")
+
+
+def write_docx(file_path, pages):
+    """
+    Writes pages of paragraphs as a DOCX file with a page break after each page.
+
+    :param file_path: The path of the DOCX file.
+    :param pages: A list of pages, each a list of paragraphs.
+    """
+    import docx
+    document = docx.Document()
+    for index, paragraphs in enumerate(pages):
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+        if index < len(pages) - 1:
+            document.add_page_break()
+    document.save(file_path)
+
+
+def write_pdf(file_path, pages, layout='single'):
+    """
+    Writes pages of paragraphs as a PDF, one input page per PDF page.
+
+    :param file_path: The path of the PDF file.
+    :param pages: A list of pages, each a list of paragraphs.
+    :param layout: 'single' for one column of 11pt text, 'columns' for two columns of 9pt text.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.pdfgen import canvas
+
+    width, height = letter
+    columns, font_size = (2, 9) if layout == 'columns' else (1, 11)
+    gutter = 0.3 * inch
+    column_width = (width - 2 * inch - gutter * (columns - 1)) / columns
+    line_height = font_size * 1.3
+
+    c = canvas.Canvas(file_path, pagesize=letter)
+    for paragraphs in pages:
+        c.setFont("Helvetica", font_size)
+        column = 0
+        y_position = height - 1 * inch
+        for paragraph in paragraphs:
+            for line in wrap_text(paragraph, column_width, "Helvetica", font_size):
+                if y_position < 1 * inch:
+                    # Text that does not fit the last column is dropped, the page count stays fixed
+                    column += 1
+                    y_position = height - 1 * inch
+                if column >= columns:
+                    break
+                c.drawString(1 * inch + column * (column_width + gutter), y_position, line)
+                y_position -= line_height
+            y_position -= line_height / 2
+        c.showPage()
+    c.save()
+
+
+def build_corpus(output_dir, file_types=('pdf', 'docx', 'txt'), documents=4, pages=5, words_per_page=350,
+                 layout='single', seed=0):
+    """
+    Generates the synthetic corpus, one folder per file type. A corpus already built
+    with the same options is reused.
+
+    :param output_dir: The folder receiving the corpus.
+    :param file_types: The file types to generate.
+    :param documents: The number of documents per file type.
+    :param pages: The number of pages per document.
+    :param words_per_page: The approximate number of words per page.
+    :param layout: The PDF layout, 'single' or 'columns'.
+    :param seed: The random seed.
+    :return: A dictionary mapping each file type to the sorted paths of its documents.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout}")
+    spec = {'file_types': sorted(file_types), 'documents': documents, 'pages': pages,
+            'words_per_page': words_per_page, 'layout': layout, 'seed': seed}
+    spec_path = os.path.join(output_dir, 'corpus.json')
+    corpus = {file_type: [os.path.join(output_dir, file_type, f"document_{index:03d}.{file_type}")
+                          for index in range(documents)] for file_type in file_types}
+
+    if os.path.exists(spec_path):
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == spec and all(os.path.exists(path) for paths in corpus.values() for path in paths):
+                return corpus
+
+    writers = {'txt': write_txt, 'docx': write_docx, 'pdf': lambda path, content: write_pdf(path, content, layout)}
+    for file_type, paths in corpus.items():
+        os.makedirs(os.path.join(output_dir, file_type), exist_ok=True)
+        for index, path in enumerate(paths):
+            # Every file type gets the same text, so their results are directly comparable
+            generator = TextGenerator(seed + index)
+            writers[file_type](path, [generator.page(words_per_page) for _ in range(pages)])
+
+    with open(spec_path, 'w', encoding='utf-8') as f:
+        json.dump(spec, f, indent=2)
+    return corpus
+
+
+def build_tiny_model(output_dir, seed=0, vocab_size=2000):
+    """
+    Builds a tiny randomly initialized BART model and a byte-level BPE tokenizer trained on
+    synthetic text. Its summaries are meaningless, but it exercises the full pipeline in seconds.
+    A model already present in output_dir is reused.
+
+    :param output_dir: The folder receiving the model.
+    :param seed: The random seed.
+    :param vocab_size: The size of the tokenizer vocabulary.
+    :return: The path of the model folder.
+    """
+    if os.path.exists(os.path.join(output_dir, 'config.json')):
+        return output_dir
+
+    import torch
+    from tokenizers import ByteLevelBPETokenizer
+    from transformers import BartConfig, BartForConditionalGeneration, BartTokenizerFast
+
+    os.makedirs(output_dir, exist_ok=True)
+    generator = TextGenerator(seed)
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator((generator.paragraph(200) for _ in range(200)), vocab_size=vocab_size,
+                            special_tokens=["<s>", "<pad>", "</s>", "<unk>", "<mask>"])
+    bpe.save_model(output_dir)
+    tokenizer = BartTokenizerFast(
+        vocab_file=os.path.join(output_dir, 'vocab.json'),
+        merges_file=os.path.join(output_dir, 'merges.txt'),
+        model_max_length=TINY_MODEL_MAX_POSITIONS,
+    )
+    tokenizer.save_pretrained(output_dir)
+
+    torch.manual_seed(seed)
+    config = BartConfig(
+        vocab_size=len(tokenizer),
+        d_model=64,
+        encoder_layers=2,
+        decoder_layers=2,
+        encoder_attention_heads=4,
+        decoder_attention_heads=4,
+        encoder_ffn_dim=128,
+        decoder_ffn_dim=128,
+        max_position_embeddings=TINY_MODEL_MAX_POSITIONS,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.eos_token_id,
+        forced_bos_token_id=tokenizer.bos_token_id,
+        forced_eos_token_id=tokenizer.eos_token_id,
+    )
+    BartForConditionalGeneration(config).save_pretrained(output_dir)
+    return output_dir
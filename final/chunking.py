@@ -0,0 +1,204 @@
+import re
+from instrumentation import stage_timer
+
+# Split after sentence-ending punctuation followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+class Chunk:
+    """
+    A piece of text together with the token ids the model will see for it.
+    """
+    __slots__ = ("text", "input_ids")
+
+    def __init__(self, text, input_ids):
+        """
+        Initializes the Chunk.
+
+        :param text: The text of the chunk.
+        :param input_ids: The token ids of the text, without special tokens.
+        """
+        self.text = text
+        self.input_ids = input_ids
+
+    def __len__(self):
+        return len(self.input_ids)
+
+
+class TokenChunker:
+    """
+    Packs sentence-aligned chunks of text up to the model's real token budget.
+    """
+
+    def __init__(self, tokenizer, max_tokens, overlap=0, metrics=None):
+        """
+        Initializes the TokenChunker.
+
+        :param tokenizer: The tokenizer of the loaded model.
+        :param max_tokens: The maximum number of input tokens the model accepts.
+        :param overlap: The number of tokens of trailing sentences to repeat at the start of the next chunk.
+        :param metrics: Optional PipelineMetrics receiving the chunk_build and tokenize timings.
+        """
+        self.tokenizer = tokenizer
+        self.metrics = metrics
+        # Leave room for the special tokens (BOS/EOS) added at inference time
+        self.max_tokens = max_tokens - tokenizer.num_special_tokens_to_add()
+        self.overlap = max(0, min(overlap, self.max_tokens // 2))
+
+    def split_sentences(self, text):
+        """
+        Splits text into sentences with normalized whitespace.
+
+        :param text: The text to split.
+        :return: A list of sentences.
+        """
+        sentences = []
+        for sentence in SENTENCE_BOUNDARY.split(text):
+            sentence = " ".join(sentence.split())
+            if sentence:
+                sentences.append(sentence)
+        return sentences
+
+    def tokenize_sentences(self, sentences):
+        """
+        Tokenizes sentences in a single batched call.
+
+        :param sentences: The sentences to tokenize.
+        :return: A list of token id lists, one per sentence.
+        """
+        if not sentences:
+            return []
+        with stage_timer(self.metrics, 'tokenize'):
+            # The leading space makes each sentence tokenize as it would mid-text
+            encoded = self.tokenizer([" " + sentence for sentence in sentences], add_special_tokens=False)
+        return encoded["input_ids"]
+
+    def chunk_text(self, text):
+        """
+        Splits text into chunks that fit the model's token budget.
+
+        :param text: The text to chunk.
+        :return: A list of Chunk objects.
+        """
+        sentences = self.split_sentences(text)
+        return self.pack(sentences, self.tokenize_sentences(sentences))
+
+    def iter_chunks(self, segments):
+        """
+        Assembles chunks from a stream of text segments such as pages or paragraphs.
+
+        Text left over at the end of a segment is carried into the next one, so
+        only the final chunk of the stream can be shorter than the token budget.
+
+        :param segments: An iterable of text segments.
+        :yield: Chunk objects.
+        """
+        return self._pack_stream(self._iter_sentences(segments))
+
+    def pack(self, sentences, sentence_ids):
+        """
+        Packs tokenized sentences into chunks, carrying the configured overlap between chunks.
+
+        :param sentences: The sentences to pack.
+        :param sentence_ids: The token ids of each sentence.
+        :return: A list of Chunk objects.
+        """
+        return list(self._pack_stream(zip(sentences, sentence_ids)))
+
+    def _iter_sentences(self, segments):
+        """
+        Splits a stream of segments into tokenized sentences, joining sentences cut by a segment boundary.
+
+        :param segments: An iterable of text segments.
+        :yield: (sentence, ids) pairs.
+        """
+        carry = ""
+        # Unterminated text (tables, headings) is only carried while it is short
+        max_carry = self.max_tokens * 8
+        for segment in segments:
+            if not segment:
+                continue
+            with stage_timer(self.metrics, 'chunk_build'):
+                sentences = self.split_sentences(carry + " " + segment if carry else segment)
+                carry = ""
+                if sentences and not sentences[-1].endswith(('.', '!', '?')) and len(sentences[-1]) < max_carry:
+                    carry = sentences.pop()
+            yield from zip(sentences, self.tokenize_sentences(sentences))
+        if carry:
+            yield from zip([carry], self.tokenize_sentences([carry]))
+
+    def _pack_stream(self, pieces):
+        """
+        Packs (sentence, ids) pairs into chunks, carrying the configured overlap between chunks.
+
+        :param pieces: An iterable of (sentence, ids) pairs.
+        :yield: Chunk objects.
+        """
+        current = []  # (sentence, ids) pairs of the chunk being built
+        current_length = 0
+
+        for sentence, ids in pieces:
+            if len(ids) > self.max_tokens:
+                # A single sentence longer than the budget is split on token boundaries. Its pieces
+                # fill up the chunk being built, and its remainder starts the next chunk, so
+                # later sentences are packed after it instead of leaving a tiny chunk
+                start = 0
+                while len(ids) - start > self.max_tokens - current_length:
+                    stop = start + self.max_tokens - current_length
+                    current.append(self._split_piece(ids[start:stop]))
+                    yield self._make_chunk(current)
+                    current, current_length = [], 0
+                    start = stop
+                current.append(self._split_piece(ids[start:]))
+                current_length += len(ids) - start
+                continue
+
+            if current and current_length + len(ids) > self.max_tokens:
+                yield self._make_chunk(current)
+                current = self._overlap_tail(current, self.max_tokens - len(ids))
+                current_length = sum(len(tail_ids) for _, tail_ids in current)
+
+            current.append((sentence, ids))
+            current_length += len(ids)
+
+        if current:
+            yield self._make_chunk(current)
+
+    def _split_piece(self, ids):
+        """
+        Builds a (sentence, ids) pair for part of a sentence split on token boundaries.
+
+        :param ids: The token ids of the part.
+        :return: A (text, ids) pair.
+        """
+        return self.tokenizer.decode(ids).strip(), list(ids)
+
+    def _overlap_tail(self, pieces, room):
+        """
+        Returns the trailing sentences of a finished chunk to repeat in the next one.
+
+        :param pieces: The (sentence, ids) pairs of the finished chunk.
+        :param room: The number of tokens still free in the next chunk.
+        :return: A list of (sentence, ids) pairs.
+        """
+        budget = min(self.overlap, room)
+        tail = []
+        length = 0
+        for sentence, ids in reversed(pieces):
+            if length + len(ids) > budget:
+                break
+            tail.insert(0, (sentence, ids))
+            length += len(ids)
+        return tail
+
+    def _make_chunk(self, pieces):
+        """
+        Builds a Chunk from (sentence, ids) pairs.
+
+        :param pieces: The (sentence, ids) pairs of the chunk.
+        :return: A Chunk object.
+        """
+        with stage_timer(self.metrics, 'chunk_build'):
+            text = " ".join(sentence for sentence, _ in pieces)
+            input_ids = [token for _, ids in pieces for token in ids]
+        return Chunk(text, input_ids)
@@ -0,0 +1,143 @@
+"""
+Compares the fp32 and dynamic int8 quantized models on a fixed document set.
+
+Each variant runs in its own process so peak RSS is measured independently.
+Quality is reported as the unigram F1 (ROUGE-1) of the int8 summaries
+against the fp32 summaries of the same documents.
+
+Usage:
+    python compare_quantization.py <documents folder> [--model model] [--summary-length medium] [--output report.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process.
+
+    :return: The peak RSS in megabytes, or None where it cannot be measured.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_in_child(function, *args):
+    """
+    Runs a function in a fresh process, so its peak RSS is measured on its own.
+
+    :param function: A picklable function.
+    :param args: The arguments of the function.
+    :return: The return value of the function.
+    :raises BrokenProcessPool: If the process dies, e.g. when it is killed for running out of memory,
+        instead of waiting for a result forever.
+    """
+    with ProcessPoolExecutor(1) as executor:
+        return executor.submit(function, *args).result()
+
+
+def run_variant(model_name, documents, summary_length, quantize):
+    """
+    Summarizes the documents with one model variant. Runs in a child process.
+
+    :param model_name: The model directory.
+    :param documents: The paths of the documents to summarize.
+    :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+    :param quantize: Whether to use the int8 model.
+    :return: The measurements and summaries of the variant.
+    """
+    from pdf_summariser_class import PDFSummarizer
+
+    load_start = time.perf_counter()
+    summarizer = PDFSummarizer(model_name=model_name, quantize=quantize)
+    load_seconds = time.perf_counter() - load_start
+
+    summaries = {}
+    chunks = 0
+    run_start = time.perf_counter()
+    for file_path in documents:
+        file_summaries = list(summarizer.summarize_file_incrementally(file_path, summary_length))
+        chunks += len(file_summaries)
+        summaries[file_path] = " ".join(file_summaries)
+    run_seconds = time.perf_counter() - run_start
+
+    return {
+        'variant': 'int8' if quantize else 'fp32',
+        'load_seconds': round(load_seconds, 2),
+        'run_seconds': round(run_seconds, 2),
+        'chunks': chunks,
+        'chunks_per_second': round(chunks / run_seconds, 3) if run_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'summaries': summaries,
+    }
+
+
+def unigram_f1(candidate, reference):
+    """
+    Computes the unigram overlap F1 (ROUGE-1) between two texts.
+
+    :param candidate: The text to evaluate.
+    :param reference: The reference text.
+    :return: The F1 score between 0 and 1.
+    """
+    candidate_counts = Counter(candidate.lower().split())
+    reference_counts = Counter(reference.lower().split())
+    overlap = sum((candidate_counts & reference_counts).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(candidate_counts.values())
+    recall = overlap / sum(reference_counts.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8 summarization speed and quality.")
+    parser.add_argument('documents', help="Folder of PDF, DOCX and TXT files to summarize.")
+    parser.add_argument('--model', default='model', help="Model directory.")
+    parser.add_argument('--summary-length', default='medium', choices=['small', 'medium', 'large'])
+    parser.add_argument('--output', help="Optional path of a JSON report.")
+    args = parser.parse_args()
+
+    documents = sorted(
+        os.path.join(args.documents, name) for name in os.listdir(args.documents)
+        if name.lower().endswith(('.pdf', '.docx', '.txt'))
+    )
+
+    # The first int8 run also quantizes and caches the model, which shows up in its load time
+    reports = {}
+    for quantize in (False, True):
+        report = run_in_child(run_variant, args.model, documents, args.summary_length, quantize)
+        reports[report['variant']] = report
+
+    fp32, int8 = reports['fp32'], reports['int8']
+    scores = [unigram_f1(int8['summaries'][path], fp32['summaries'][path]) for path in documents]
+    comparison = {
+        'documents': len(documents),
+        'speedup': round(fp32['run_seconds'] / int8['run_seconds'], 2) if int8['run_seconds'] else None,
+        'rouge1_f1_vs_fp32': round(sum(scores) / len(scores), 3) if scores else None,
+        'variants': {name: {key: value for key, value in report.items() if key != 'summaries'}
+                     for name, report in reports.items()},
+    }
+
+    for name, report in comparison['variants'].items():
+        print(f"{name}: load {report['load_seconds']}s, run {report['run_seconds']}s, "
+              f"{report['chunks_per_second']} chunks/s, peak RSS {report['peak_rss_mb']} MB")
+    print(f"Speedup: {comparison['speedup']}x, ROUGE-1 F1 vs fp32: {comparison['rouge1_f1_vs_fp32']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(comparison, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
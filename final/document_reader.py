@@ -0,0 +1,187 @@
+import os
+from collections import deque
+from functools import partial
+from instrumentation import stage_timer
+
+SUPPORTED_FILE_TYPES = ('pdf', 'docx', 'txt')
+TXT_BLOCK_SIZE = 2048  # Characters read from a TXT file per segment
+PDF_PAGES_PER_TASK = 4  # Pages extracted per process pool task
+OCR_PAGES_PER_TASK = 1  # OCR is slow enough that single pages balance the workers best
+
+
+def get_file_type(file_path):
+    """
+    Returns the lower-case extension of a file.
+
+    :param file_path: The path to the file.
+    :return: The file type, e.g. 'pdf'.
+    """
+    return file_path.split('.')[-1].lower()
+
+
+def extract_pdf_pages(file_path, start, stop):
+    """
+    Extracts the text of a range of PDF pages. Runs inside extraction worker processes.
+
+    :param file_path: The path to the PDF file.
+    :param start: The index of the first page to extract.
+    :param stop: The index after the last page to extract.
+    :return: A list with the text of each page.
+    """
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return [(page.extract_text() or "") for page in pdf.pages[start:stop]]
+
+
+def iter_pdf_pages_parallel(file_path, executor, prefetch, metrics=None, extract=extract_pdf_pages,
+                            pages_per_task=PDF_PAGES_PER_TASK):
+    """
+    Extracts PDF pages ahead of the consumer in a process pool, yielding them in page order.
+
+    At most `prefetch` tasks are in flight, so extraction overlaps with whatever the
+    consumer does between pages while memory stays bounded.
+
+    :param file_path: The path to the PDF file.
+    :param executor: A ProcessPoolExecutor to extract pages in.
+    :param prefetch: The maximum number of page-range tasks submitted ahead of the consumer.
+    :param metrics: Optional PipelineMetrics receiving the file_open and page_extract_wait timings.
+    :param extract: The picklable function extracting a page range, called as extract(file_path, start, stop).
+    :param pages_per_task: The number of pages per task.
+    :yield: The text of each page.
+    """
+    import pdfplumber
+    with stage_timer(metrics, 'file_open'):
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+
+    page_ranges = deque((start, min(start + pages_per_task, page_count))
+                        for start in range(0, page_count, pages_per_task))
+    in_flight = deque()
+    try:
+        while page_ranges or in_flight:
+            while page_ranges and len(in_flight) < prefetch:
+                start, stop = page_ranges.popleft()
+                in_flight.append(executor.submit(extract, file_path, start, stop))
+            # Time spent waiting here is extraction the pool could not hide behind inference
+            with stage_timer(metrics, 'page_extract_wait'):
+                pages = in_flight.popleft().result()
+            yield from pages
+    finally:
+        # Drop queued work if the consumer stops early
+        for future in in_flight:
+            future.cancel()
+
+
+def iter_document_segments(file_path, executor=None, prefetch=4, metrics=None, ocr_options=None):
+    """
+    Extracts a document once, yielding its text one segment at a time.
+
+    Segments are PDF pages, DOCX paragraphs or fixed-size TXT blocks, so that
+    every segment corresponds to one unit counted by count_document_units.
+
+    :param file_path: The path to the file (PDF, DOCX, TXT).
+    :param executor: Optional ProcessPoolExecutor used to extract PDF pages ahead of time.
+    :param prefetch: The maximum number of PDF page-range tasks in flight when an executor is given.
+    :param metrics: Optional PipelineMetrics receiving the file_open and page_extract timings.
+    :param ocr_options: Optional keyword arguments for ocr_reader.extract_pdf_pages_ocr (dpi, language,
+        min_text_chars). If given, scanned PDF pages are OCRed.
+    :yield: The text of each segment. Empty segments are yielded as empty strings.
+    """
+    file_type = get_file_type(file_path)
+
+    # Parsers are imported on first use to keep application startup fast
+    if file_type == 'pdf' and executor is not None and ocr_options is not None:
+        from ocr_reader import extract_pdf_pages_ocr
+        yield from iter_pdf_pages_parallel(file_path, executor, max(1, prefetch), metrics,
+                                           partial(extract_pdf_pages_ocr, **ocr_options), OCR_PAGES_PER_TASK)
+
+    elif file_type == 'pdf' and executor is not None:
+        yield from iter_pdf_pages_parallel(file_path, executor, max(1, prefetch), metrics)
+
+    elif file_type == 'pdf':
+        import pdfplumber
+        with stage_timer(metrics, 'file_open'):
+            pdf = pdfplumber.open(file_path)
+        with pdf:
+            for page_number, page in enumerate(pdf.pages):
+                with stage_timer(metrics, 'page_extract'):
+                    page_text = page.extract_text() or ""
+                if ocr_options is not None:
+                    from ocr_reader import page_text_or_ocr
+                    with stage_timer(metrics, 'ocr'):
+                        page_text = page_text_or_ocr(file_path, page_number, page, page_text, **ocr_options)
+                yield page_text
+
+    elif file_type == 'docx':
+        import docx
+        # python-docx parses the whole document on open
+        with stage_timer(metrics, 'file_open'):
+            doc = docx.Document(file_path)
+        for para in doc.paragraphs:
+            yield para.text
+
+    elif file_type == 'txt':
+        with stage_timer(metrics, 'file_open'):
+            f = open(file_path, 'r', encoding='utf-8')
+        with f:
+            while True:
+                with stage_timer(metrics, 'page_extract'):
+                    # Finish the current line so blocks never end in the middle of a word
+                    block = f.read(TXT_BLOCK_SIZE)
+                    if block:
+                        block += f.readline()
+                if not block:
+                    break
+                yield block
+
+    else:
+        raise ValueError(f"Unsupported file format: {file_type}")
+
+
+def count_docx_paragraphs(file_path):
+    """
+    Counts the paragraphs of a DOCX file by scanning its XML for paragraph tags, without parsing it.
+
+    Paragraphs inside tables are counted too, so this is an upper bound of the paragraphs
+    python-docx yields.
+
+    :param file_path: The path to the DOCX file.
+    :return: The number of paragraphs.
+    """
+    import zipfile
+    count = 0
+    tail = b""
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as xml:
+        while True:
+            block = xml.read(1 << 16)
+            if not block:
+                break
+            data = tail + block
+            count += data.count(b"<w:p>") + data.count(b"<w:p ")
+            # A complete 5-byte tag never fits in the last 4 bytes, so a tag split across blocks is counted once
+            tail = data[-4:]
+    return count
+
+
+def count_document_units(file_path):
+    """
+    Counts the segments of a document from cheap metadata, without extracting any text.
+
+    :param file_path: The path to the file (PDF, DOCX, TXT).
+    :return: The number of segments iter_document_segments will yield, or 0 for unsupported files.
+    """
+    file_type = get_file_type(file_path)
+    try:
+        if file_type == 'pdf':
+            import pdfplumber
+            # Opening the document only reads the page tree; no layout analysis is done
+            with pdfplumber.open(file_path) as pdf:
+                return len(pdf.pages)
+        elif file_type == 'docx':
+            return count_docx_paragraphs(file_path)
+        elif file_type == 'txt':
+            # Estimated from the file size; multi-byte characters make this an upper bound
+            return max(1, -(-os.path.getsize(file_path) // TXT_BLOCK_SIZE))
+    except Exception as e:
+        print(f"Error reading metadata of {file_path}: {e}")
+    return 0
@@ -0,0 +1,198 @@
+import re
+import numpy as np
+from chunking import SENTENCE_BOUNDARY
+
+WORD = re.compile(r"[a-z][a-z']*")
+
+# NLTK's English stop words, so the engine works without downloading the corpus
+STOP_WORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours yourself yourselves he him
+his himself she she's her hers herself it it's its itself they them their theirs themselves what which who
+whom this that that'll these those am is are was were be been being have has had having do does did doing
+a an the and but if or because as until while of at by for with about against between into through during
+before after above below to from up down in out on off over under again further then once here there when
+where why how all any both each few more most other some such no nor not only own same so than too very s t
+can will just don don't should should've now d ll m o re ve y ain aren aren't couldn couldn't didn didn't
+doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't ma mightn mightn't mustn mustn't needn needn't
+shan shan't shouldn shouldn't wasn wasn't weren weren't won won't wouldn wouldn't
+""".split())
+
+
+def split_sentences(text):
+    """
+    Splits text into sentences with normalized whitespace.
+
+    :param text: The text to split.
+    :return: A list of sentences.
+    """
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence = " ".join(sentence.split())
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def default_stemmer():
+    """
+    Returns NLTK's Snowball stemmer if NLTK is installed, otherwise no stemming.
+
+    :return: A callable mapping a word to its stem.
+    """
+    try:
+        from nltk.stem.snowball import SnowballStemmer
+    except ImportError:
+        return lambda word: word
+    return SnowballStemmer("english", ignore_stopwords=True).stem
+
+
+class ExtractiveSummarizer:
+    """
+    Scores and selects the most representative sentences of a text.
+    """
+
+    def __init__(self, stemmer=None, stop_words=STOP_WORDS, sentence_splitter=split_sentences):
+        """
+        Initializes the ExtractiveSummarizer.
+
+        :param stemmer: Optional callable mapping a word to its stem. Defaults to NLTK's Snowball stemmer.
+        :param stop_words: The words ignored when scoring.
+        :param sentence_splitter: Callable splitting text into sentences, e.g. nltk.sent_tokenize.
+        """
+        self.stem = stemmer or default_stemmer()
+        self.stop_words = frozenset(stop_words)
+        self.split_sentences = sentence_splitter
+        self.stems = {}  # Word to stem, so each distinct word is only stemmed once
+
+    def term_matrix(self, sentences):
+        """
+        Builds the sparse sentence-by-stem presence matrix.
+
+        :param sentences: The sentences of the text.
+        :return: (rows, columns, vocabulary_size, term_counts): the sentence and stem index of every
+            non-zero entry, the number of distinct stems, and how often each stem occurs in the text.
+        """
+        stem_ids = {}
+        sentence_index = []
+        term_index = []
+        for index, sentence in enumerate(sentences):
+            for word in WORD.findall(sentence.lower().replace("’", "'")):
+                if word in self.stop_words:
+                    continue
+                stem = self.stems.get(word)
+                if stem is None:
+                    stem = self.stems[word] = self.stem(word)
+                sentence_index.append(index)
+                term_index.append(stem_ids.setdefault(stem, len(stem_ids)))
+
+        rows = np.asarray(sentence_index, dtype=np.int64)
+        columns = np.asarray(term_index, dtype=np.int64)
+        vocabulary_size = len(stem_ids)
+        term_counts = np.bincount(columns, minlength=vocabulary_size)
+
+        # A stem counts once per sentence, however often it is repeated there
+        pairs = np.unique(rows * max(1, vocabulary_size) + columns)
+        return pairs // max(1, vocabulary_size), pairs % max(1, vocabulary_size), vocabulary_size, term_counts
+
+    def score_sentences(self, sentences, weighting='frequency'):
+        """
+        Scores sentences by the weights of the distinct stems they contain.
+
+        :param sentences: The sentences of the text.
+        :param weighting: 'frequency' sums the text frequency of each stem. 'tfidf' also weighs each stem by
+            its smoothed inverse sentence frequency and divides by the square root of the sentence length,
+            so repeated boilerplate and long run-on sentences do not dominate.
+        :return: A NumPy array with one score per sentence.
+        """
+        rows, columns, vocabulary_size, term_counts = self.term_matrix(sentences)
+        weights = term_counts.astype(np.float64)
+        if weighting == 'tfidf':
+            sentence_counts = np.bincount(columns, minlength=vocabulary_size)
+            # Smoothed so a stem found in every sentence still counts, e.g. in a one-sentence text
+            weights *= np.log((1 + len(sentences)) / (1 + sentence_counts)) + 1
+        elif weighting != 'frequency':
+            raise ValueError(f"Unknown weighting: {weighting}")
+
+        # Sparse matrix-vector product: sum the stem weights of each row
+        # bincount returns integers for a text without any scoring words
+        scores = np.bincount(rows, weights=weights[columns], minlength=len(sentences)).astype(np.float64)
+        if weighting == 'tfidf':
+            scores /= np.sqrt(np.maximum(1, np.bincount(rows, minlength=len(sentences))))
+        return scores
+
+    def rank(self, sentences, weighting='tfidf'):
+        """
+        Orders sentences from most to least informative, leaving out repeats and sentences without words.
+
+        Repeated sentences such as running headers and footers are only ranked once,
+        at their first occurrence, and tables of numbers have no scoring words at all.
+
+        :param sentences: The sentences of the text.
+        :param weighting: The term weighting, 'tfidf' or 'frequency'.
+        :return: A NumPy array of sentence indices, best first.
+        """
+        scores = self.score_sentences(sentences, weighting)
+        seen = set()
+        for index, sentence in enumerate(sentences):
+            key = sentence.lower()
+            if key in seen:
+                scores[index] = 0.0
+            seen.add(key)
+        ranked = np.argsort(-scores, kind='stable')
+        return ranked[scores[ranked] > 0]
+
+    def select(self, scores, threshold=None, ratio=None, max_sentences=None):
+        """
+        Chooses the sentences to keep.
+
+        :param scores: The sentence scores.
+        :param threshold: Keep sentences scoring above this multiple of the average score.
+        :param ratio: Keep this fraction of the sentences with the highest scores.
+        :param max_sentences: Keep at most this many sentences with the highest scores.
+        :return: The indices of the kept sentences in document order.
+        """
+        if not len(scores):
+            return np.empty(0, dtype=np.int64)
+        if threshold is not None:
+            scored = scores[scores > 0]
+            average = scored.mean() if len(scored) else 0.0
+            return np.flatnonzero(scores > threshold * average)
+
+        count = len(scores)
+        if ratio is not None:
+            count = max(1, int(round(len(scores) * ratio)))
+        if max_sentences is not None:
+            count = min(count, max_sentences)
+        # A stable sort keeps earlier sentences first among equal scores
+        ranked = np.argsort(-scores, kind='stable')[:count]
+        return np.sort(ranked)
+
+    def summarize(self, text, threshold=None, ratio=None, max_sentences=None):
+        """
+        Summarizes text by extracting its highest scoring sentences.
+
+        :param text: The text to summarize.
+        :param threshold: Keep sentences scoring above this multiple of the average score.
+        :param ratio: Keep this fraction of the sentences.
+        :param max_sentences: Keep at most this many sentences.
+            Without any of these options, the top 20% of the sentences are kept.
+        :return: The kept sentences joined in document order.
+        """
+        sentences = [" ".join(sentence.split()) for sentence in self.split_sentences(text)]
+        if threshold is None and ratio is None and max_sentences is None:
+            ratio = 0.2
+        kept = self.select(self.score_sentences(sentences), threshold, ratio, max_sentences)
+        return " ".join(sentences[index] for index in kept)
+
+
+def summarize(text, threshold=None, ratio=None, max_sentences=None):
+    """
+    Summarizes text by extracting its highest scoring sentences.
+
+    :param text: The text to summarize.
+    :param threshold: Keep sentences scoring above this multiple of the average score.
+    :param ratio: Keep this fraction of the sentences.
+    :param max_sentences: Keep at most this many sentences.
+    :return: The kept sentences joined in document order.
+    """
+    return ExtractiveSummarizer().summarize(text, threshold, ratio, max_sentences)
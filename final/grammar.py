@@ -0,0 +1,232 @@
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import stage_timer
+
+# Summaries are sent to LanguageTool as paragraphs of one request
+SEPARATOR = "\n\n"
+
+
+class GrammarCorrector:
+    """
+    Corrects summaries with LanguageTool as a pipeline stage of its own.
+
+    Many summaries are checked in one request, results are cached by text hash,
+    and the LanguageTool server is only started when the first text needs checking.
+    """
+
+    def __init__(self, language='en-US', batch_size=16, max_batch_chars=20000, cache_size=4096, server_url=None,
+                 metrics=None):
+        """
+        Initializes the GrammarCorrector without starting LanguageTool.
+
+        :param language: The LanguageTool language code. For British English, use 'en-GB'.
+        :param batch_size: The maximum number of summaries checked per request.
+        :param max_batch_chars: The maximum number of characters checked per request.
+        :param cache_size: The number of corrected texts kept in memory.
+        :param server_url: Optional URL of a running LanguageTool server to reuse instead of starting one,
+            e.g. 'http://localhost:8081'. Several processes can share one server this way.
+        :param metrics: Optional PipelineMetrics receiving the grammar_correction timings.
+        """
+        self.language = language
+        self.batch_size = max(1, batch_size)
+        self.max_batch_chars = max_batch_chars
+        self.cache_size = cache_size
+        self.server_url = server_url
+        self.metrics = metrics
+        self.tool = None
+        self.tool_error = None  # Set when LanguageTool failed to start, so it is not retried for every batch
+        self.tool_lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        # Corrections run beside inference; one thread keeps requests to the server in order
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="grammar")
+
+    def get_tool(self):
+        """
+        Starts or connects to LanguageTool on first use.
+
+        :return: The language_tool_python.LanguageTool instance, or None if it could not be started.
+        """
+        with self.tool_lock:
+            if self.tool is None and self.tool_error is None:
+                print("Starting LanguageTool...")
+                try:
+                    import language_tool_python
+                    if self.server_url:
+                        self.tool = language_tool_python.LanguageTool(self.language, remote_server=self.server_url)
+                    else:
+                        self.tool = language_tool_python.LanguageTool(self.language)
+                except Exception as e:
+                    self.tool_error = e
+                    print(f"Error starting LanguageTool, summaries are left uncorrected: {e}")
+            return self.tool
+
+    def correct(self, text):
+        """
+        Corrects the grammar of a text.
+
+        :param text: The text to be corrected.
+        :return: The corrected text.
+        """
+        return self.correct_batch([text])[0]
+
+    def correct_batch(self, texts):
+        """
+        Corrects several texts with as few LanguageTool requests as possible.
+
+        :param texts: The texts to be corrected.
+        :return: A list of corrected texts in the same order.
+        """
+        results = list(texts)
+        keys = {}
+        for index, text in enumerate(texts):
+            if not text.strip():
+                continue
+            key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[index] = cached
+                if self.metrics:
+                    self.metrics.increment('grammar_cache_hits')
+            else:
+                keys.setdefault(key, []).append(index)
+
+        # Identical texts in the batch are only checked once
+        pending = [(key, texts[indices[0]]) for key, indices in keys.items()]
+        if pending and self.get_tool() is None:
+            return results  # LanguageTool is unavailable; the failure was reported when it was first started
+        for start, stop in self._request_ranges([text for _, text in pending]):
+            group = pending[start:stop]
+            try:
+                corrected = self._check_and_apply([text for _, text in group])
+            except Exception as e:
+                print(f"Error correcting grammar: {e}")
+                continue  # Leave the texts uncorrected
+            for (key, _), text in zip(group, corrected):
+                self._cache_put(key, text)
+                for index in keys[key]:
+                    results[index] = text
+        return results
+
+    def correct_stream(self, items):
+        """
+        Corrects a stream of tagged summaries while the producer keeps running.
+
+        A batch is sent as soon as the previous one has finished, so batches grow
+        when LanguageTool is the bottleneck and the first result is never held back.
+
+        :param items: An iterable of (tag, text) pairs, e.g. from PDFSummarizer.summarize_tagged_stream.
+        :yield: (tag, corrected text) pairs in the order the items were given.
+        """
+        pending = deque()  # (tags, future) per submitted batch
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size or not pending or pending[-1][1].done():
+                pending.append(self._submit(batch))
+                batch = []
+            # Keep at most two batches in flight so a fast producer cannot run far ahead
+            while pending and (pending[0][1].done() or len(pending) > 2):
+                yield from self._resolve(pending.popleft())
+        if batch:
+            pending.append(self._submit(batch))
+        while pending:
+            yield from self._resolve(pending.popleft())
+
+    def _submit(self, batch):
+        tags = [tag for tag, _ in batch]
+        return tags, self.executor.submit(self.correct_batch, [text for _, text in batch])
+
+    def _resolve(self, submitted):
+        tags, future = submitted
+        return zip(tags, future.result())
+
+    def _request_ranges(self, texts):
+        """
+        Splits texts into consecutive groups that respect the request limits.
+
+        :param texts: The texts to check.
+        :return: A list of (start, stop) index ranges.
+        """
+        ranges = []
+        start = 0
+        chars = 0
+        for index, text in enumerate(texts):
+            if index > start and (index - start >= self.batch_size or chars + len(text) > self.max_batch_chars):
+                ranges.append((start, index))
+                start, chars = index, 0
+            chars += len(text) + len(SEPARATOR)
+        if start < len(texts):
+            ranges.append((start, len(texts)))
+        return ranges
+
+    def _check_and_apply(self, texts):
+        """
+        Checks texts in a single request and applies the first suggestion of each match.
+
+        :param texts: The texts to check.
+        :return: A list of corrected texts.
+        """
+        tool = self.get_tool()
+        joined = SEPARATOR.join(texts)
+        with stage_timer(self.metrics, 'grammar_correction'):
+            matches = tool.check(joined)
+        if self.metrics:
+            self.metrics.increment('grammar_requests')
+            self.metrics.increment('grammar_texts', len(texts))
+
+        # Map each match back to the text it falls in; matches crossing a separator are dropped
+        bounds = []
+        offset = 0
+        for text in texts:
+            bounds.append((offset, offset + len(text)))
+            offset += len(text) + len(SEPARATOR)
+        per_text = [[] for _ in texts]
+        index = 0
+        for match in sorted(matches, key=lambda match: match.offset):
+            while index < len(bounds) and match.offset >= bounds[index][1]:
+                index += 1
+            if index == len(bounds):
+                break
+            start, stop = bounds[index]
+            if match.replacements and match.offset >= start and match.offset + match.errorLength <= stop:
+                per_text[index].append((match.offset - start, match.errorLength, match.replacements[0]))
+
+        corrected = []
+        for text, edits in zip(texts, per_text):
+            # Apply from the end so earlier offsets stay valid
+            last_start = len(text) + 1
+            for offset, length, replacement in reversed(edits):
+                if offset + length > last_start:
+                    continue  # Overlaps an edit already applied
+                text = text[:offset] + replacement + text[offset + length:]
+                last_start = offset
+            corrected.append(text)
+        return corrected
+
+    def _cache_get(self, key):
+        with self.cache_lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        return None
+
+    def _cache_put(self, key, text):
+        with self.cache_lock:
+            self.cache[key] = text
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def close(self):
+        """
+        Stops the correction thread and the LanguageTool server, if one was started.
+        """
+        self.executor.shutdown(cancel_futures=True)
+        with self.tool_lock:
+            if self.tool is not None:
+                self.tool.close()
+                self.tool = None
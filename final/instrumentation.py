@@ -0,0 +1,155 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class PipelineMetrics:
+    """
+    Thread-safe timers and counters for the stages of a summarization run.
+    """
+
+    def __init__(self, keep_samples=False):
+        """
+        Initializes the PipelineMetrics.
+
+        :param keep_samples: Whether to keep every duration so the report can include latency percentiles.
+            Off by default, as a long-running summarizer would otherwise grow without bound.
+        """
+        self.lock = threading.Lock()
+        self.keep_samples = keep_samples
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all timers and counters and restarts the run clock.
+        """
+        with self.lock:
+            self.stages = {}
+            self.samples = {}
+            self.counters = {}
+            self.start_time = time.perf_counter()
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Times a block of code as one call of a stage.
+
+        :param stage: The name of the stage, e.g. 'generate'.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        """
+        Records one call of a stage.
+
+        :param stage: The name of the stage.
+        :param seconds: The duration of the call.
+        """
+        with self.lock:
+            entry = self.stages.setdefault(stage, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            entry['count'] += 1
+            entry['total_seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            if self.keep_samples:
+                self.samples.setdefault(stage, []).append(seconds)
+
+    def increment(self, counter, amount=1):
+        """
+        Increments a counter.
+
+        :param counter: The name of the counter, e.g. 'input_tokens'.
+        :param amount: The amount to add.
+        """
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def report(self):
+        """
+        Returns the per-run report.
+
+        :return: A dictionary with wall_seconds, stages (count, total, mean and max seconds, plus
+            p50/p90/p99 seconds when samples are kept) and counters.
+        """
+        with self.lock:
+            stages = {}
+            for stage, entry in sorted(self.stages.items()):
+                stages[stage] = {
+                    'count': entry['count'],
+                    'total_seconds': round(entry['total_seconds'], 6),
+                    'mean_seconds': round(entry['total_seconds'] / entry['count'], 6),
+                    'max_seconds': round(entry['max_seconds'], 6),
+                }
+                if stage in self.samples:
+                    stages[stage].update(latency_percentiles(self.samples[stage]))
+            return {
+                'wall_seconds': round(time.perf_counter() - self.start_time, 6),
+                'stages': stages,
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def write_json(self, file_path):
+        """
+        Writes the per-run report as JSON.
+
+        :param file_path: The path of the JSON report.
+        """
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def to_prometheus(self, prefix='summarizer'):
+        """
+        Formats the report in the Prometheus text exposition format.
+
+        :param prefix: The prefix of every metric name.
+        :return: The metrics as text.
+        """
+        report = self.report()
+        lines = [
+            f"# TYPE {prefix}_stage_seconds_total counter",
+            *(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {entry["total_seconds"]}'
+              for stage, entry in report['stages'].items()),
+            f"# TYPE {prefix}_stage_calls_total counter",
+            *(f'{prefix}_stage_calls_total{{stage="{stage}"}} {entry["count"]}'
+              for stage, entry in report['stages'].items()),
+            f"# TYPE {prefix}_stage_max_seconds gauge",
+            *(f'{prefix}_stage_max_seconds{{stage="{stage}"}} {entry["max_seconds"]}'
+              for stage, entry in report['stages'].items()),
+        ]
+        for counter, value in report['counters'].items():
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            lines.append(f"{prefix}_{counter}_total {value}")
+        return "\n".join(lines) + "\n"
+
+
+def latency_percentiles(samples, percentiles=(50, 90, 99)):
+    """
+    Computes latency percentiles with the nearest-rank method.
+
+    :param samples: The measured durations in seconds.
+    :param percentiles: The percentiles to compute.
+    :return: A dictionary such as {'p50_seconds': 0.12, 'p90_seconds': 0.3, 'p99_seconds': 0.41}.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {
+        f"p{percentile}_seconds": round(ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)], 6)
+        for percentile in percentiles
+    }
+
+
+def stage_timer(metrics, stage):
+    """
+    Returns a timer for a stage, or a no-op context if no metrics are collected.
+
+    :param metrics: A PipelineMetrics instance or None.
+    :param stage: The name of the stage.
+    :return: A context manager.
+    """
+    return metrics.timer(stage) if metrics is not None else nullcontext()
@@ -1,13 +1,65 @@
+import time
+STARTUP_TIME = time.perf_counter()  # Taken before any other import so the report covers them
+
 import sys
+import multiprocessing
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QFileDialog, QMessageBox, QProgressBar, QComboBox
+    QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QPlainTextEdit, QFileDialog, QMessageBox, QProgressBar, QComboBox,
+    QCheckBox
 )
 from PyQt5.QtCore import QThread, pyqtSignal, QTimer, QEventLoop
 from PyQt5.QtGui import QFont
-import pdfplumber
-import docx
 import os
-from frontend import SplashScreen
+from document_reader import count_document_units
+from startup_report import StartupReport
+from progress import ProgressTracker
+
+startup_report = StartupReport(STARTUP_TIME)
+
+UI_REFRESH_INTERVAL_MS = 100  # How often buffered summary chunks are drawn
+
+
+class SummaryBuffer:
+    """
+    A list-backed store of summary chunks that also tracks which chunks are not yet displayed.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.displayed = 0  # Number of chunks already drawn in the view
+
+    def append(self, chunk):
+        """
+        Stores a summary chunk.
+
+        :param chunk: The summarized chunk of text.
+        """
+        self.chunks.append(chunk)
+
+    def take_pending(self):
+        """
+        Returns the chunks added since the last call and marks them as displayed.
+
+        :return: A list of summary chunks.
+        """
+        pending = self.chunks[self.displayed:]
+        self.displayed = len(self.chunks)
+        return pending
+
+    def text(self):
+        """
+        Joins all chunks once, e.g. for saving.
+
+        :return: The full summary text.
+        """
+        return "\n".join(self.chunks)
+
+    def clear(self):
+        self.chunks = []
+        self.displayed = 0
+
+    def __bool__(self):
+        return bool(self.chunks)
+
 
 class SummarizerThread(QThread):
     """
@@ -15,76 +67,69 @@ class SummarizerThread(QThread):
     """
     progress = pyqtSignal(str)  # Signal to send incremental updates
     progress_bar_update = pyqtSignal(int)  # Signal to update progress bar
+    status_update = pyqtSignal(str)  # Signal to send throughput and ETA
     finished = pyqtSignal()  # Signal to indicate completion
 
-    def __init__(self, summarizer, file_path=None, folder_path=None, summary_length='medium'):
+    def __init__(self, summarizer, file_path=None, folder_path=None, summary_length='medium', correct_grammar=False):
         super().__init__()
         self.summarizer = summarizer
         self.file_path = file_path
         self.folder_path = folder_path
         self.summary_length = summary_length
+        self.correct_grammar = correct_grammar
 
     def run(self):
         """
         Runs the summarization process.
         """
         try:
-            total_length = 0
-            processed_length = 0  # Track the processed length
             if self.file_path:
-                total_length = self.calculate_total_length(self.file_path)
-                # Summarize a single file
-                for summary in self.summarizer.summarize_file_incrementally(self.file_path, self.summary_length):
+                file_paths = [self.file_path]
+            else:
+                file_paths = [os.path.join(self.folder_path, file) for file in os.listdir(self.folder_path)]
+
+            # Progress is measured in segments (pages, paragraphs, TXT blocks) from cheap metadata,
+            # so documents are only extracted once, by the summarizer itself
+            file_units = [self.calculate_total_units(file_path) for file_path in file_paths]
+            self.tracker = ProgressTracker(sum(file_units), unit_name="pages")
+
+            for file_path, units in zip(file_paths, file_units):
+                reported = [0]
+
+                def on_units(units_done):
+                    # Called with the segments covered by the summary about to be yielded
+                    self.tracker.advance(units=units_done - reported[0], chunks=1)
+                    reported[0] = units_done
+
+                summaries = self.summarizer.summarize_file_incrementally(file_path, self.summary_length, on_units,
+                                                                         correct_grammar=self.correct_grammar)
+                for summary in summaries:
                     self.progress.emit(summary)
-                    processed_length += len(summary)
-                    self.progress_bar_update.emit(int((processed_length / total_length) * 100))
-            elif self.folder_path:
-                total_length = self.calculate_total_length_folder(self.folder_path)
-                for file in os.listdir(self.folder_path):
-                    file_path = os.path.join(self.folder_path, file)
-                    for summary in self.summarizer.summarize_file_incrementally(file_path, self.summary_length):
-                        self.progress.emit(summary)
-                        processed_length += len(summary)
-                        self.progress_bar_update.emit(int((processed_length / total_length) * 100))
+                    self.report_progress()
+                # Metadata can overestimate a file's segments; count the file as complete
+                self.tracker.advance(units=units - reported[0])
+                self.report_progress()
             self.finished.emit()
             self.progress_bar_update.emit(100)  # Ensure progress bar is complete
         except Exception as e:
             self.progress.emit(f"Error: {e}")
             self.finished.emit()  # Ensure finished signal is emitted on error
 
-    def calculate_total_length(self, file_path):
+    def report_progress(self):
+        """
+        Emits the progress percentage and the throughput/ETA status line.
+        """
+        self.progress_bar_update.emit(self.tracker.snapshot()['percent'])
+        self.status_update.emit(self.tracker.format())
+
+    def calculate_total_units(self, file_path):
         """
-        Calculates the total length of the file content.
+        Calculates the number of segments in a file without extracting its text.
 
         :param file_path: The path to the file.
-        :return: The total length of the file content.
-        """
-        total_length = 0
-        if file_path.endswith('.pdf'):
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    total_length += len(page.extract_text())
-        elif file_path.endswith('.docx'):
-            doc = docx.Document(file_path)
-            for paragraph in doc.paragraphs:
-                total_length += len(paragraph.text)
-        elif file_path.endswith('.txt'):
-            with open(file_path, 'r') as file:
-                total_length += len(file.read())
-        return total_length
-
-    def calculate_total_length_folder(self, folder_path):
-        """
-        Calculates the total length of all files in a folder.
-
-        :param folder_path: The path to the folder.
-        :return: The total length of all files in the folder.
-        """
-        total_length = 0
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            total_length += self.calculate_total_length(file_path)
-        return total_length
+        :return: The number of pages, paragraphs or TXT blocks in the file.
+        """
+        return count_document_units(file_path)
 
 class InitializationThread(QThread):
     """
@@ -97,8 +142,11 @@ class InitializationThread(QThread):
         Runs the initialization process.
         """
         try:
+            # torch and transformers are only imported here, off the UI thread
             from pdf_summariser_class import PDFSummarizer
+            startup_report.mark("summarizer_imported")
             summarizer = PDFSummarizer(model_name="model")
+            startup_report.mark("model_loaded")
             self.initialization_complete.emit(summarizer)
         except Exception as e:
             print(f"Initialization error: {e}")
@@ -108,13 +156,27 @@ class PDFSummarizerApp(QWidget):
     """
     The main application window for the PDF Summarizer.
     """
-    def __init__(self, summarizer):
+    def __init__(self, summarizer=None):
         super().__init__()
         self.summarizer = summarizer
-        self.summary_text = ""
+        self.summary_buffer = SummaryBuffer()
         self.thread = None
+        self.pending_request = None  # Selection made while the model is still loading
         self.initUI()
 
+    def set_summarizer(self, summarizer):
+        """
+        Installs the summarizer once the model has loaded and starts any pending request.
+
+        :param summarizer: The loaded PDFSummarizer.
+        """
+        self.summarizer = summarizer
+        self.current_file_label.setText('')
+        if self.pending_request:
+            file_path, folder_path = self.pending_request
+            self.pending_request = None
+            self.start_summarization_thread(file_path=file_path, folder_path=folder_path)
+
     def initUI(self):
         """
         Initializes the UI components.
@@ -160,7 +222,7 @@ class PDFSummarizerApp(QWidget):
             QPushButton:hover {
                 background-color: #2980b9;
             }
-            QTextEdit {
+            QPlainTextEdit {
                 font-size: 14px;
                 color: #34495e;
                 background-color: white;
@@ -199,15 +261,29 @@ class PDFSummarizerApp(QWidget):
         self.summary_length_combo.addItems(['small', 'medium', 'large'])
         layout.addWidget(self.summary_length_combo)
 
+        # Grammar correction starts LanguageTool (a Java server) on first use, so it is opt-in
+        self.grammar_checkbox = QCheckBox('Correct grammar (starts LanguageTool)')
+        layout.addWidget(self.grammar_checkbox)
+
         # Text area for displaying results
-        self.result_text = QTextEdit()
+        self.result_text = QPlainTextEdit()
         self.result_text.setReadOnly(True)
+        self.result_text.setUndoRedoEnabled(False)  # No undo history for a read-only view
         layout.addWidget(self.result_text)
 
+        # Incoming chunks are drawn in batches on a timer instead of one repaint per chunk
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(UI_REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.flush_summary_buffer)
+
         # Progress bar
         self.progress_bar = QProgressBar()
         layout.addWidget(self.progress_bar)
 
+        # Throughput and estimated time remaining
+        self.status_label = QLabel('')
+        layout.addWidget(self.status_label)
+
         # Save summary button
         self.save_button = QPushButton('Save Summary as PDF')
         self.save_button.setEnabled(False)  # Initially disabled
@@ -224,22 +300,33 @@ class PDFSummarizerApp(QWidget):
         :param file_path: The path to the file to summarize.
         :param folder_path: The path to the folder to summarize.
         """
+        if self.summarizer is None:
+            # The model is still loading in the background; start as soon as it is ready
+            self.pending_request = (file_path, folder_path)
+            self.current_file_label.setText("Loading model, summarization will start automatically...")
+            return
+
         summary_length = self.summary_length_combo.currentText()
+        correct_grammar = self.grammar_checkbox.isChecked()
         if file_path:
             self.current_file_label.setText(f"Summarizing File: {file_path}")
-            self.thread = SummarizerThread(self.summarizer, file_path=file_path, summary_length=summary_length)
+            self.thread = SummarizerThread(self.summarizer, file_path=file_path, summary_length=summary_length,
+                                           correct_grammar=correct_grammar)
         elif folder_path:
             self.current_file_label.setText(f"Summarizing Folder: {folder_path}")
-            self.thread = SummarizerThread(self.summarizer, folder_path=folder_path, summary_length=summary_length)
+            self.thread = SummarizerThread(self.summarizer, folder_path=folder_path, summary_length=summary_length,
+                                           correct_grammar=correct_grammar)
 
         # Connect signals
         self.thread.progress.connect(self.update_text_incrementally)
         self.thread.progress_bar_update.connect(self.update_progress_bar)
+        self.thread.status_update.connect(self.status_label.setText)
         self.thread.finished.connect(self.summarization_finished)
 
         # Clear the previous result
         self.result_text.clear()
-        self.summary_text = ""
+        self.summary_buffer.clear()
+        self.refresh_timer.start()
         
         # Set up the progress bar
         self.progress_bar.setMaximum(100)
@@ -257,6 +344,8 @@ class PDFSummarizerApp(QWidget):
         Handles the completion of the summarization process.
         """
         self.thread = None
+        self.refresh_timer.stop()
+        self.flush_summary_buffer()
         self.save_button.setEnabled(True)
         self.progress_bar.setValue(self.progress_bar.maximum())  # Set progress bar to complete
         QMessageBox.information(self, "Summarization Complete", "Summarization is complete.")
@@ -271,9 +360,15 @@ class PDFSummarizerApp(QWidget):
 
         :param chunk: The summarized chunk of text.
         """
-        self.summary_text += chunk + "\n"
-        self.result_text.append(chunk)
-        QApplication.processEvents()  # Ensure the UI updates in real-time
+        self.summary_buffer.append(chunk)
+
+    def flush_summary_buffer(self):
+        """
+        Draws the chunks received since the last refresh with a single append.
+        """
+        pending = self.summary_buffer.take_pending()
+        if pending:
+            self.result_text.appendPlainText("\n".join(pending))
 
     def update_progress_bar(self, value):
         """
@@ -281,7 +376,7 @@ class PDFSummarizerApp(QWidget):
 
         :param value: The value to update the progress bar with.
         """
-        self.progress_bar.setValue(self.progress_bar.value() + value)
+        self.progress_bar.setValue(value)
 
     def select_file(self):
         """
@@ -307,14 +402,14 @@ class PDFSummarizerApp(QWidget):
         """
         Saves the summarized text as a PDF.
         """
-        if self.summary_text:
+        if self.summary_buffer:
             output_file_path, _ = QFileDialog.getSaveFileName(
                 self, 'Save Summary PDF', '', 'PDF Files (*.pdf)'
             )
             if output_file_path:
                 header = "Summarized and Corrected Text"
                 try:
-                    self.summarizer.create_beautiful_pdf(output_file_path, self.summary_text, header)
+                    self.summarizer.create_beautiful_pdf(output_file_path, self.summary_buffer.text(), header)
                     QMessageBox.information(self, "Success", f"Summary saved to {output_file_path}")
                 except Exception as e:
                     QMessageBox.critical(self, "Error", f"Error saving PDF: {e}")
@@ -324,41 +419,46 @@ class PDFSummarizerApp(QWidget):
 def main():
     """
     The main entry point for the application.
+
+    Pass --startup-report <path> to write the cold-start timings as JSON and exit once the model is loaded.
     """
+    report_path = None
+    if '--startup-report' in sys.argv:
+        report_path = sys.argv[sys.argv.index('--startup-report') + 1]
+
     app = QApplication(sys.argv)
-    app.main_window = None  # Add this line to hold a reference to main_window
 
-    # Create splash screen with fixed size
-    splash = SplashScreen(800, 600)
-    splash.show()
+    # Show a usable window right away; the model loads while the user picks files
+    app.main_window = PDFSummarizerApp()
+    app.main_window.current_file_label.setText("Loading model...")
+    app.main_window.show()
+    screen = QApplication.primaryScreen().geometry()
+    x = (screen.width() - app.main_window.width()) // 2
+    y = (screen.height() - app.main_window.height()) // 2
+    app.main_window.move(x, y)
     app.processEvents()
-    
-    # Start the initialization thread during splash screen
+    startup_report.mark("window_shown")
+
+    # Load the model in the background
     init_thread = InitializationThread()
-    
-    # Function to handle transition after initialization
+
     def on_initialization_complete(summarizer):
         if summarizer is not None:
-            # Initialize main window with the loaded summarizer
-            app.main_window = PDFSummarizerApp(summarizer)  # Store reference in app
-            splash.close()
-            app.main_window.show()
-            # Center main window
-            screen = QApplication.primaryScreen().geometry()
-            x = (screen.width() - app.main_window.width()) // 2
-            y = (screen.height() - app.main_window.height()) // 2
-            app.main_window.move(x, y)
+            app.main_window.set_summarizer(summarizer)
+            if report_path:
+                startup_report.write(report_path)
+                app.quit()
         else:
-            splash.close()
             QMessageBox.critical(None, "Initialization Error", "An error occurred during initialization.")
             sys.exit(1)  # Exit the application with an error code
 
     # Connect the signal and start the initialization thread
     init_thread.initialization_complete.connect(on_initialization_complete)
     init_thread.start()
-    
+
     return app.exec_()
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Extraction workers re-launch the frozen executable
     sys.exit(main())
     
\ No newline at end of file
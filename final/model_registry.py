@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import sys
+
+MODEL_WEIGHTS_FILE = 'model.safetensors'
+CACHE_FOLDER_NAME = 'AI-text-summary'
+
+
+def default_manifest_path(base_folder):
+    """
+    Returns the manifest path for a model folder inside the user's cache directory,
+    so listing models never writes into the folder being listed.
+
+    :param base_folder: The absolute path of the model folder.
+    :return: The path of the manifest file.
+    """
+    if sys.platform == 'win32':
+        cache_root = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    elif sys.platform == 'darwin':
+        cache_root = os.path.expanduser('~/Library/Caches')
+    else:
+        cache_root = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    folder_hash = hashlib.sha256(base_folder.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_root, CACHE_FOLDER_NAME, f"model_manifest_{folder_hash}.json")
+
+
+class ModelRegistry:
+    """
+    Discovers local models from their files and config.json, without loading any weights.
+
+    Scan results are cached in a small manifest keyed by directory mtimes, so
+    unchanged directories are not listed again on the next scan.
+    """
+
+    def __init__(self, base_folder, manifest_path=None):
+        """
+        Initializes the ModelRegistry.
+
+        :param base_folder: The folder to search for models.
+        :param manifest_path: The path of the scan manifest. Defaults to a file in the user's cache directory.
+        """
+        self.base_folder = os.path.abspath(base_folder)
+        self.manifest_path = manifest_path or default_manifest_path(self.base_folder)
+
+    def load_manifest(self):
+        """
+        Loads the cached scan results.
+
+        :return: A dictionary of directory paths to cached entries.
+        """
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest):
+        """
+        Saves the scan results. A cache directory that cannot be written is skipped.
+
+        :param manifest: A dictionary of directory paths to cached entries.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+        except OSError as e:
+            print(f"Could not write model manifest: {e}")
+
+    def read_model_metadata(self, dir_path, weights_size):
+        """
+        Reads the metadata of a model from its config.json.
+
+        :param dir_path: The model directory.
+        :param weights_size: The size of the weights file in bytes.
+        :return: A dictionary describing the model.
+        """
+        metadata = {
+            'path': dir_path,
+            'name': os.path.basename(dir_path),
+            'size_bytes': weights_size,
+            'architectures': [],
+            'model_type': None,
+            'max_position_embeddings': None,
+        }
+        try:
+            with open(os.path.join(dir_path, 'config.json'), 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            metadata['architectures'] = config.get('architectures') or []
+            metadata['model_type'] = config.get('model_type')
+            metadata['max_position_embeddings'] = config.get('max_position_embeddings')
+        except (OSError, ValueError) as e:
+            print(f"Could not read config of model {dir_path}: {e}")
+        return metadata
+
+    def scan_directory(self, dir_path, mtime, manifest, new_manifest):
+        """
+        Lists a single directory, reusing the manifest entry if the directory is unchanged.
+
+        :param dir_path: The directory to scan.
+        :param mtime: The modification time of the directory.
+        :param manifest: The manifest from the previous scan.
+        :param new_manifest: The manifest being built by this scan.
+        :return: A (model metadata or None, list of (subdirectory, mtime)) tuple.
+        """
+        cached = manifest.get(dir_path)
+        if cached and cached['mtime'] == mtime:
+            subdirs = []
+            for subdir in cached['subdirs']:
+                try:
+                    subdirs.append((subdir, os.stat(subdir).st_mtime))
+                except OSError:
+                    continue
+            model = cached['model']
+            if model:
+                # config.json may be edited in place without touching the directory mtime
+                config_mtime = self._config_mtime(dir_path)
+                if config_mtime != cached.get('config_mtime'):
+                    model = self.read_model_metadata(dir_path, model['size_bytes'])
+                    cached = dict(cached, model=model, config_mtime=config_mtime)
+            new_manifest[dir_path] = cached
+            return model, subdirs
+
+        model = None
+        subdirs = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    # Symlinked model directories on shared drives are followed; list_models guards against cycles
+                    if entry.is_dir():
+                        subdirs.append((entry.path, entry.stat().st_mtime))
+                    elif entry.name == MODEL_WEIGHTS_FILE:
+                        model = self.read_model_metadata(dir_path, entry.stat().st_size)
+                except OSError:
+                    continue
+
+        new_manifest[dir_path] = {
+            'mtime': mtime,
+            'subdirs': [subdir for subdir, _ in subdirs],
+            'model': model,
+            'config_mtime': self._config_mtime(dir_path) if model else None,
+        }
+        return model, subdirs
+
+    def _config_mtime(self, dir_path):
+        """
+        Returns the modification time of a model's config.json, or None if it is missing.
+
+        :param dir_path: The model directory.
+        :return: The modification time.
+        """
+        try:
+            return os.stat(os.path.join(dir_path, 'config.json')).st_mtime
+        except OSError:
+            return None
+
+    def list_models(self):
+        """
+        Lists all models below the base folder.
+
+        :return: A list of model metadata dictionaries, sorted by path.
+        """
+        manifest = self.load_manifest()
+        new_manifest = {}
+        models = []
+
+        try:
+            pending = [(self.base_folder, os.stat(self.base_folder).st_mtime)]
+        except OSError as e:
+            print(f"Model folder not found: {e}")
+            return models
+
+        visited = set()  # (device, inode) of scanned directories, so symlink cycles end
+        while pending:
+            dir_path, mtime = pending.pop()
+            try:
+                stat = os.stat(dir_path)
+                if (stat.st_dev, stat.st_ino) in visited:
+                    continue
+                visited.add((stat.st_dev, stat.st_ino))
+                model, subdirs = self.scan_directory(dir_path, mtime, manifest, new_manifest)
+            except OSError as e:
+                print(f"Could not scan {dir_path}: {e}")
+                continue
+            # Only subdirectories count as models, matching find_model_folders
+            if model and dir_path != self.base_folder:
+                models.append(model)
+            pending.extend(subdirs)
+
+        if new_manifest != manifest:
+            self.save_manifest(new_manifest)
+        return sorted(models, key=lambda model: model['path'])
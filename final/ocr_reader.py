@@ -0,0 +1,104 @@
+import os
+
+OCR_DPI = 200  # Enough for body text; 500 DPI images are six times larger for little accuracy gain
+OCR_MIN_TEXT_CHARS = 20  # Pages with less embedded text than this are treated as scanned
+
+
+def default_ocr_workers():
+    """
+    Returns the default number of OCR processes: half the CPU cores, leaving the rest to inference.
+
+    :return: The number of processes.
+    """
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def init_ocr_worker():
+    """
+    Initializes an OCR worker process.
+
+    Tesseract starts an OpenMP thread per core in every process by default, which
+    oversubscribes the CPU when several pages are OCRed in parallel beside inference.
+    """
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+
+def page_needs_ocr(page, text, min_text_chars=OCR_MIN_TEXT_CHARS):
+    """
+    Decides whether a PDF page is scanned, i.e. its text is only available as an image.
+
+    :param page: The pdfplumber page.
+    :param text: The text extracted from the page's text layer.
+    :param min_text_chars: The amount of embedded text below which a page with images is OCRed.
+    :return: True if the page should be OCRed.
+    """
+    return len(text.strip()) < min_text_chars and bool(page.images)
+
+
+def ocr_page(file_path, page_number, dpi=OCR_DPI, language='eng'):
+    """
+    Renders a single PDF page to an in-memory image and OCRs it.
+
+    :param file_path: The path to the PDF file.
+    :param page_number: The index of the page, starting at 0.
+    :param dpi: The resolution the page is rendered at.
+    :param language: The Tesseract language code.
+    :return: The recognized text.
+    """
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    # Only the requested page is rendered, so memory holds one image per worker
+    image = convert_from_path(file_path, dpi=dpi, first_page=page_number + 1, last_page=page_number + 1)[0]
+    try:
+        text = pytesseract.image_to_string(image, lang=language)
+    finally:
+        image.close()
+    # Join words hyphenated across line ends
+    return text.replace("-\n", "")
+
+
+def page_text_or_ocr(file_path, page_number, page, text, dpi=OCR_DPI, language='eng',
+                     min_text_chars=OCR_MIN_TEXT_CHARS):
+    """
+    Returns a page's embedded text, or its OCR text if the page is scanned.
+
+    :param file_path: The path to the PDF file.
+    :param page_number: The index of the page, starting at 0.
+    :param page: The pdfplumber page.
+    :param text: The text extracted from the page's text layer.
+    :param dpi: The resolution scanned pages are rendered at.
+    :param language: The Tesseract language code.
+    :param min_text_chars: The amount of embedded text below which a page with images is OCRed.
+    :return: The text of the page.
+    """
+    if not page_needs_ocr(page, text, min_text_chars):
+        return text
+    try:
+        return ocr_page(file_path, page_number, dpi, language)
+    except Exception as e:
+        print(f"Error running OCR on page {page_number + 1} of {file_path}: {e}")
+        return text
+
+
+def extract_pdf_pages_ocr(file_path, start, stop, dpi=OCR_DPI, language='eng', min_text_chars=OCR_MIN_TEXT_CHARS):
+    """
+    Extracts the text of a range of PDF pages, OCRing the pages that are scanned.
+    Runs inside extraction worker processes.
+
+    :param file_path: The path to the PDF file.
+    :param start: The index of the first page to extract.
+    :param stop: The index after the last page to extract.
+    :param dpi: The resolution scanned pages are rendered at.
+    :param language: The Tesseract language code.
+    :param min_text_chars: The amount of embedded text below which a page with images is OCRed.
+    :return: A list with the text of each page.
+    """
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(file_path) as pdf:
+        for page_number in range(start, stop):
+            page = pdf.pages[page_number]
+            text = page.extract_text() or ""
+            texts.append(page_text_or_ocr(file_path, page_number, page, text, dpi, language, min_text_chars))
+    return texts
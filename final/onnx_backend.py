@@ -0,0 +1,64 @@
+import json
+import os
+
+ONNX_DIR = 'onnx'
+SIGNATURE_FILE = 'source_signature.json'
+MODEL_WEIGHTS_FILE = 'model.safetensors'
+
+
+def onnx_model_path(model_path):
+    """
+    Returns the directory holding the exported ONNX artifacts of a model.
+
+    :param model_path: The model directory.
+    :return: The ONNX export directory, next to the model weights.
+    """
+    return os.path.join(model_path, ONNX_DIR)
+
+
+def source_signature(model_path):
+    """
+    Identifies the weights an ONNX export was made from.
+
+    :param model_path: The model directory.
+    :return: A dictionary that must match for the export to be reused.
+    """
+    weights_path = os.path.join(model_path, MODEL_WEIGHTS_FILE)
+    return {'weights_mtime': os.path.getmtime(weights_path) if os.path.exists(weights_path) else None}
+
+
+def load_onnx_model(model_path):
+    """
+    Loads the ONNX Runtime model of a model directory, exporting it on first use.
+
+    The encoder, the decoder and the decoder-with-past (KV cache reuse) graphs are
+    exported once and cached in an 'onnx' folder next to model.safetensors.
+
+    :param model_path: The model directory.
+    :return: An ORTModelForSeq2SeqLM running on the CPU, usable wherever the torch model's generate is.
+    """
+    # optimum and onnxruntime are only required when this backend is selected
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    export_path = onnx_model_path(model_path)
+    signature_path = os.path.join(export_path, SIGNATURE_FILE)
+    signature = source_signature(model_path)
+
+    try:
+        with open(signature_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == signature:
+                print(f"Loading ONNX model from {export_path}")
+                return ORTModelForSeq2SeqLM.from_pretrained(export_path, use_cache=True, provider='CPUExecutionProvider')
+        print("ONNX export is stale, exporting again.")
+    except (OSError, ValueError):
+        print("No ONNX export found, exporting the model.")
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_path, export=True, use_cache=True, provider='CPUExecutionProvider')
+    try:
+        model.save_pretrained(export_path)
+        with open(signature_path, 'w', encoding='utf-8') as f:
+            json.dump(signature, f)
+        print(f"Saved ONNX export to {export_path}")
+    except Exception as e:
+        print(f"Error saving ONNX export: {e}")
+    return model
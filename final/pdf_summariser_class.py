@@ -1,37 +1,137 @@
 import os
 import torch
 from transformers import pipeline
-import pdfplumber
-import docx
-from concurrent.futures import ThreadPoolExecutor
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from textwrap import wrap
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from collections import deque
 import sys
+from chunking import Chunk, TokenChunker
+from summary_cache import SummaryCache
+from model_registry import ModelRegistry
+from result_sinks import JsonlSink, MemorySink, PdfSink
+from report_writer import PdfReportWriter
+from document_reader import SUPPORTED_FILE_TYPES, get_file_type, iter_document_segments
+from instrumentation import PipelineMetrics
+from grammar import GrammarCorrector
+from ocr_reader import default_ocr_workers, init_ocr_worker
 
 class PDFSummarizer:
     """
     A class to summarize text from PDF, DOCX, and TXT files using a pre-trained model.
     """
 
-    def __init__(self, model_name="model"):
+    def __init__(self, model_name="model", max_chunk_tokens=None, chunk_overlap=0, batch_size=1, sort_window=4,
+                 cache_dir=None, cache_max_bytes=256 * 1024 * 1024, extraction_workers=0, extraction_prefetch=4,
+                 quantize=False, backend="torch", inference_workers=None, grammar_language='en-US',
+                 grammar_batch_size=16, grammar_server=None, extractive_ratio=None, extractive_max_tokens=None,
+                 ocr=False, ocr_dpi=200, ocr_language='eng', ocr_workers=None):
         """
         Initializes the PDFSummarizer with the specified model.
 
         :param model_name: The name or path of the model to use for summarization.
+        :param max_chunk_tokens: The maximum number of input tokens per chunk. Defaults to the model's limit.
+        :param chunk_overlap: The number of tokens repeated between consecutive chunks.
+        :param batch_size: The number of chunks summarized per generate call. 1 disables batching.
+        :param sort_window: The number of batches gathered and length-sorted together before inference.
+        :param cache_dir: Optional directory for the persistent summary cache.
+        :param cache_max_bytes: The maximum size of the summary cache before LRU eviction.
+        :param extraction_workers: The number of processes extracting PDF pages ahead of inference. 0 extracts inline.
+        :param extraction_prefetch: The maximum number of page-range extraction tasks queued ahead of inference.
+            With OCR enabled, it is raised to at least the number of extraction processes.
+        :param quantize: Whether to run a dynamic int8 quantized copy of the model on the CPU.
+        :param backend: The inference backend, 'torch' or 'onnx' (ONNX Runtime on the CPU).
+        :param inference_workers: The number of threads running inference concurrently. Defaults to 1, as
+            each generate call already uses all of torch's intra-op threads.
+        :param grammar_language: The LanguageTool language used by grammar correction.
+        :param grammar_batch_size: The maximum number of summaries checked per LanguageTool request.
+        :param grammar_server: Optional URL of a running LanguageTool server to reuse.
+        :param extractive_ratio: If set, only this fraction of each document's highest ranked sentences is
+            sent to the model, e.g. 0.3.
+        :param extractive_max_tokens: If set, at most this many input tokens of each document are sent to
+            the model, taking the highest ranked sentences first.
+        :param ocr: Whether to OCR scanned PDF pages. Pages with a text layer are never OCRed.
+        :param ocr_dpi: The resolution scanned pages are rendered at for OCR.
+        :param ocr_language: The Tesseract language code.
+        :param ocr_workers: The number of OCR processes if extraction_workers is 0. Defaults to half the CPU cores,
+            leaving the rest to inference.
         """
         try:
             # Define model and device (CUDA, CPU, or MPS for Apple Silicon)
             self.device = 0 if torch.cuda.is_available() else ("mps" if torch.backends.mps.is_built() else -1)
+            if backend not in ("torch", "onnx"):
+                raise ValueError(f"Unknown backend: {backend}")
+            if quantize and backend == "onnx":
+                raise ValueError("Dynamic quantization is only supported by the torch backend.")
+            if quantize or backend == "onnx":
+                self.device = -1  # Quantized kernels and the ONNX backend only run on the CPU
             print(f"Using device: {'CUDA' if self.device == 0 else 'CPU'}")
 
+            # Per-stage timers and counters, reported by metrics_report()
+            self.metrics = PipelineMetrics()
+
             # Adjust model path if running from a PyInstaller bundle
             base = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
             model_path = os.path.join(base, model_name)
+            self.model_path = model_path
 
             # Load the summarizer
-            self.summarizer = pipeline("summarization", model=model_path, device=self.device)
+            if backend == "onnx":
+                from onnx_backend import load_onnx_model
+                self.model_variant = "onnx"
+                self.summarizer = pipeline("summarization", model=load_onnx_model(model_path), tokenizer=model_path, device=self.device)
+            elif quantize:
+                from quantization import load_quantized_model
+                self.model_variant = "int8"
+                self.summarizer = pipeline("summarization", model=load_quantized_model(model_path), tokenizer=model_path, device=self.device)
+            else:
+                self.model_variant = "fp32"
+                self.summarizer = pipeline("summarization", model=model_path, device=self.device)
+            self.tokenizer = self.summarizer.tokenizer
+            self.model = self.summarizer.model
+
+            # Chunk against the real token budget of the loaded model
+            self.max_input_tokens = self.model_max_input_tokens()
+            if max_chunk_tokens:
+                self.max_input_tokens = min(self.max_input_tokens, max_chunk_tokens)
+            self.chunker = TokenChunker(self.tokenizer, self.max_input_tokens, chunk_overlap, self.metrics)
+            self.batch_size = max(1, batch_size)
+            self.sort_window = max(1, sort_window)
+
+            # Optional on-disk cache of chunk summaries
+            self.cache = SummaryCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+            # OCR always runs in the extraction process pool, rendering one page at a time
+            self.ocr_options = {'dpi': ocr_dpi, 'language': ocr_language} if ocr else None
+            if ocr and extraction_workers <= 0:
+                extraction_workers = ocr_workers or default_ocr_workers()
+
+            # Optional process pool extracting PDF pages while the model is busy
+            self.extraction_pool = None
+            if extraction_workers > 0:
+                initializer = init_ocr_worker if ocr else None
+                self.extraction_pool = ProcessPoolExecutor(extraction_workers, initializer=initializer)
+            self.extraction_prefetch = extraction_prefetch
+            if ocr:
+                # Each OCR task holds one page, so fewer tasks in flight than workers would leave processes idle
+                self.extraction_prefetch = max(extraction_prefetch, extraction_workers)
+
+            # One scheduler for the lifetime of the summarizer, shared by all pages and files.
+            # torch already spreads each generate call over all cores, so one worker is the default;
+            # work is still submitted ahead, so the model never waits for extraction.
+            self.inference_workers = max(1, inference_workers or 1)
+            self.inference_pool = ThreadPoolExecutor(self.inference_workers, thread_name_prefix="summarizer")
+
+            # Optional extractive pre-filter shrinking documents before the model sees them
+            self.extractive_ratio = extractive_ratio
+            self.extractive_max_tokens = extractive_max_tokens
+            self.extractive = None
+            if extractive_ratio or extractive_max_tokens:
+                from extractive import ExtractiveSummarizer
+                self.extractive = ExtractiveSummarizer(sentence_splitter=self.chunker.split_sentences)
+
+            # LanguageTool is only started the first time grammar correction is used
+            self.grammar = GrammarCorrector(grammar_language, grammar_batch_size, server_url=grammar_server,
+                                            metrics=self.metrics)
         except Exception as e:
             print(f"Error initializing PDFSummarizer: {e}")
             raise e
@@ -43,16 +143,21 @@ class PDFSummarizer:
         :param base_folder: The base folder to search for model files.
         :return: A list of folders containing model files.
         """
+        return PDFSummarizer.list_available_models(base_folder)
+
+    @staticmethod
+    def describe_available_models(base_folder="."):
+        """
+        Describes available models in the specified base folder without loading any of them.
+
+        :param base_folder: The base folder to search for models.
+        :return: A list of dictionaries with path, name, size_bytes, architectures, model_type
+            and max_position_embeddings of each model.
+        """
         if getattr(sys, 'frozen', False):
             base_folder = os.path.dirname(sys.executable)
-        
-        model_folders = []
-        for root, dirs, files in os.walk(base_folder):
-            for dir_name in dirs:
-                dir_path = os.path.join(root, dir_name)
-                if 'model.safetensors' in os.listdir(dir_path):
-                    model_folders.append(dir_path)
-        return model_folders
+
+        return ModelRegistry(base_folder).list_models()
 
     @staticmethod
     def list_available_models(base_folder="."):
@@ -62,47 +167,245 @@ class PDFSummarizer:
         :param base_folder: The base folder to search for models.
         :return: A list of available model folders.
         """
-        if getattr(sys, 'frozen', False):
-            base_folder = os.path.dirname(sys.executable)
-        
-        summarizer = PDFSummarizer()
-        return summarizer.find_model_folders(base_folder)
+        return [model['path'] for model in PDFSummarizer.describe_available_models(base_folder)]
+
+    def model_max_input_tokens(self):
+        """
+        Determines the maximum number of input tokens the loaded model accepts.
+
+        :return: The maximum number of input tokens.
+        """
+        limits = [getattr(self.model.config, 'max_position_embeddings', None), self.tokenizer.model_max_length]
+        # Tokenizers without a configured limit report a huge sentinel value
+        limits = [limit for limit in limits if limit and limit < 100000]
+        return min(limits) if limits else 1024
+
+    def summary_length_bounds(self, length, summary_length='medium'):
+        """
+        Computes the minimum and maximum summary length for an input.
+
+        :param length: The number of tokens in the input.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: A (min_length, max_length) tuple in tokens.
+        """
+        if summary_length == 'small':
+            min_summary_length = length // 5
+            max_summary_length = length // 3
+        elif summary_length == 'large':
+            min_summary_length = length // 2
+            max_summary_length = length
+        else:  # medium
+            min_summary_length = length // 3
+            max_summary_length = length // 2
+        return min_summary_length, max(max_summary_length, min_summary_length + 1)
 
     def summarize_chunk(self, chunk, summary_length='medium'):
         """
         Summarizes a single chunk of text.
 
-        :param chunk: The text chunk to summarize.
+        :param chunk: The Chunk to summarize, or plain text which is chunked first.
         :param summary_length: The desired length of the summary ('small', 'medium', 'large').
         :return: The summarized text.
         """
         try:
-            length = len(chunk.split())
-            max_input_length = 1024  # Maximum input length for the model
-
-            if summary_length == 'small':
-                min_summary_length = length // 5
-                max_summary_length = length // 3
-            elif summary_length == 'large':
-                min_summary_length = length // 2
-                max_summary_length = length
-            else:  # medium
-                min_summary_length = length // 3
-                max_summary_length = length // 2
-
+            if not isinstance(chunk, Chunk):
+                chunks = self.chunker.chunk_text(chunk)
+                if len(chunks) > 1:
+                    print(f"Splitting text into {len(chunks)} chunks.")
+                return " ".join(self.summarize_chunk(sub_chunk, summary_length) for sub_chunk in chunks)
+
+            cache_key = self.cache_key(chunk, summary_length) if self.cache else None
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.metrics.increment('cache_hits')
+                    return cached
+
+            min_summary_length, max_summary_length = self.summary_length_bounds(len(chunk), summary_length)
             print(f"min_summary_length: {min_summary_length}, max_summary_length: {max_summary_length}")
-            chunk_words = chunk.split()
-            if len(chunk_words) > max_input_length:
-                sub_chunks = [" ".join(chunk_words[i:i + len(chunk_words) // 2]) for i in range(0, len(chunk_words), len(chunk_words) // 2)]
-                summaries = [self.summarizer(sub_chunk, max_length=max_summary_length, min_length=min_summary_length)[0]['summary_text'] for sub_chunk in sub_chunks]
-                print(f"Splitting chunk into {len(sub_chunks)} sub-chunks.")
-                return " ".join(summaries)
-            else:
-                return self.summarizer(chunk, max_length=max_summary_length, min_length=min_summary_length)[0]['summary_text']
+
+            # Reuse the chunk's token ids so the text is never tokenized twice
+            input_ids = torch.tensor([self.tokenizer.build_inputs_with_special_tokens(chunk.input_ids)], device=self.model.device)
+            with torch.no_grad(), self.metrics.timer('generate'):
+                output_ids = self.model.generate(input_ids, min_length=min_summary_length, max_length=max_summary_length)
+            self.metrics.increment('chunks_summarized')
+            self.metrics.increment('input_tokens', len(chunk))
+            summary = self.tokenizer.decode(output_ids[0], skip_special_tokens=True, clean_up_tokenization_spaces=True)
+            if cache_key and summary:
+                self.cache.put(cache_key, summary)
+            return summary
         except Exception as e:
             print(f"Error summarizing chunk: {e}")
             return ""
 
+    def cache_key(self, chunk, summary_length='medium', bounds=None):
+        """
+        Builds the summary cache key for a chunk.
+
+        :param chunk: The Chunk to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :param bounds: The (min_length, max_length) actually passed to generate. Defaults to the chunk's own bounds.
+        :return: The cache key.
+        """
+        min_summary_length, max_summary_length = bounds or self.summary_length_bounds(len(chunk), summary_length)
+        generation_params = {"min_length": min_summary_length, "max_length": max_summary_length}
+        return SummaryCache.make_key(chunk.text, f"{self.model_path}:{self.model_variant}", generation_params, summary_length)
+
+    def cache_stats(self):
+        """
+        Returns the summary cache counters.
+
+        :return: A dictionary with hits, misses, entries and bytes, or None if caching is disabled.
+        """
+        return self.cache.stats() if self.cache else None
+
+    def summarize_batch(self, chunks, summary_length='medium'):
+        """
+        Summarizes several chunks, running a single padded generate call for those not in the cache.
+
+        :param chunks: The Chunk objects to summarize, ideally of similar length.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: A list of summaries in the same order as the chunks.
+        """
+        results = [None] * len(chunks)
+        # Summaries are cached under the bounds the whole batch is generated with
+        bounds = self.batch_length_bounds(chunks, summary_length)
+        cache_keys = [self.cache_key(chunk, summary_length, bounds) for chunk in chunks] if self.cache else [None] * len(chunks)
+        pending = []
+        for index, cache_key in enumerate(cache_keys):
+            cached = self.cache.get(cache_key) if cache_key else None
+            if cached is None:
+                pending.append(index)
+            else:
+                results[index] = cached
+                self.metrics.increment('cache_hits')
+
+        if pending:
+            summaries = self.generate_batch([chunks[index] for index in pending], summary_length, bounds)
+            for index, summary in zip(pending, summaries):
+                results[index] = summary
+                if cache_keys[index] and summary:
+                    self.cache.put(cache_keys[index], summary)
+        return results
+
+    def batch_length_bounds(self, chunks, summary_length='medium'):
+        """
+        Computes the summary length bounds shared by a batch of chunks.
+
+        :param chunks: The Chunk objects of the batch.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: A (min_length, max_length) tuple in tokens.
+        """
+        # The shortest chunk bounds the minimum and the longest bounds the maximum
+        min_summary_length, _ = self.summary_length_bounds(min(len(chunk) for chunk in chunks), summary_length)
+        _, max_summary_length = self.summary_length_bounds(max(len(chunk) for chunk in chunks), summary_length)
+        return min_summary_length, max_summary_length
+
+    def generate_batch(self, chunks, summary_length='medium', bounds=None):
+        """
+        Summarizes several chunks with a single padded generate call.
+
+        :param chunks: The Chunk objects to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :param bounds: The (min_length, max_length) to generate with. Defaults to the bounds of the chunks.
+        :return: A list of summaries in the same order as the chunks.
+        """
+        bounds = bounds or self.batch_length_bounds(chunks, summary_length)
+        try:
+            min_summary_length, max_summary_length = bounds
+
+            features = [{"input_ids": self.tokenizer.build_inputs_with_special_tokens(chunk.input_ids)} for chunk in chunks]
+            batch = self.tokenizer.pad(features, padding=True, return_tensors="pt")
+            with torch.no_grad(), self.metrics.timer('generate'):
+                output_ids = self.model.generate(
+                    batch["input_ids"].to(self.model.device),
+                    attention_mask=batch["attention_mask"].to(self.model.device),
+                    min_length=min_summary_length,
+                    max_length=max_summary_length,
+                )
+            self.metrics.increment('chunks_summarized', len(chunks))
+            self.metrics.increment('input_tokens', sum(len(chunk) for chunk in chunks))
+            self.metrics.increment('padded_tokens', batch["input_ids"].numel())
+            return self.tokenizer.batch_decode(output_ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+        except Exception as e:
+            print(f"Error summarizing batch of {len(chunks)} chunks: {e}")
+            if len(chunks) == 1:
+                return [""]
+            # Retry one chunk at a time with the same bounds, so the results match their cache keys
+            return [self.generate_batch([chunk], summary_length, bounds)[0] for chunk in chunks]
+
+    def summarize_chunks(self, chunks, summary_length='medium'):
+        """
+        Summarizes chunks in length-sorted batches, yielding results in document order.
+
+        :param chunks: An iterable of Chunk objects.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :yield: Summarized chunks of text in the order the chunks were given.
+        """
+        for _, summary in self.summarize_tagged_batched(((None, chunk) for chunk in chunks), summary_length):
+            yield summary
+
+    def summarize_tagged_batched(self, items, summary_length='medium'):
+        """
+        Summarizes tagged chunks in length-sorted batches on the inference scheduler.
+        Closing the generator cancels the submitted batches that have not started yet.
+
+        :param items: An iterable of (tag, Chunk) pairs. A message string in place of a Chunk is passed through.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :yield: (tag, summary) pairs in the order the items were given.
+        """
+        items = iter(items)
+        window_size = self.batch_size * self.sort_window
+        previous = current = None
+        try:
+            while True:
+                # The next window is read and submitted before the previous one is resolved,
+                # so the model is never idle at a window boundary
+                window = list(islice(items, window_size))
+                current = self._submit_window(window, summary_length) if window else None
+                if previous is not None:
+                    yield from self._resolve_window(previous)
+                if current is None:
+                    break
+                previous, current = current, None
+        finally:
+            # If the consumer stops early, batches that have not started are dropped
+            for submitted in (previous, current):
+                if submitted is not None:
+                    for future in submitted[2]:
+                        future.cancel()
+
+    def _submit_window(self, window, summary_length):
+        """
+        Submits the chunks of a window to the inference scheduler in length-sorted batches.
+
+        :param window: A list of (tag, Chunk or message string) pairs.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: A (window, batches, futures) tuple for _resolve_window.
+        """
+        # Sort by length so each batch carries as little padding as possible
+        order = sorted((index for index, (_, value) in enumerate(window) if not isinstance(value, str)),
+                       key=lambda index: len(window[index][1]))
+        batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+        futures = [self.inference_pool.submit(self.summarize_batch, [window[index][1] for index in indices], summary_length)
+                   for indices in batches]
+        return window, batches, futures
+
+    def _resolve_window(self, submitted):
+        """
+        Waits for the batches of a window.
+
+        :param submitted: A (window, batches, futures) tuple from _submit_window.
+        :yield: (tag, summary) pairs in window order.
+        """
+        window, batches, futures = submitted
+        results = [value if isinstance(value, str) else None for _, value in window]
+        for indices, future in zip(batches, futures):
+            for index, summary in zip(indices, future.result()):
+                results[index] = summary
+        for (tag, _), summary in zip(window, results):
+            yield tag, summary
+
     def summarize_text_incrementally_generator(self, text, summary_length='medium'):
         """
         Generates summarized chunks incrementally.
@@ -111,61 +414,321 @@ class PDFSummarizer:
         :param summary_length: The desired length of the summary ('small', 'medium', 'large').
         :yield: Summarized chunks of text.
         """
-        words = text.split()
-        max_chunk_size = 400  # Adjust chunk size for performance
-        print("words", len(words))
+        # Split text into sentence-aligned chunks that fill the model's token budget
+        chunks = self.chunker.chunk_text(text)
+        print("chunks", len(chunks))
+        yield from self.summarize_chunk_stream(chunks, summary_length)
 
-        # Split text into chunks of max_chunk_size words
-        chunks = [" ".join(words[i:i + max_chunk_size]) for i in range(0, len(words), max_chunk_size)]
+    def summarize_chunk_stream(self, chunks, summary_length='medium'):
+        """
+        Summarizes chunks in batches or in parallel, depending on the configured batch size.
 
-        # Process chunks using ThreadPoolExecutor
-        with ThreadPoolExecutor() as executor:
-            results = executor.map(lambda chunk: self.summarize_chunk(chunk, summary_length), chunks)
-            for result in results:
-                yield result  # Yield each summarized chunk as it's completed
+        :param chunks: The Chunk objects to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :yield: Summarized chunks of text in the order of the chunks.
+        """
+        for _, summary in self.summarize_tagged_stream(((None, chunk) for chunk in chunks), summary_length):
+            yield summary
 
-    def summarize_file_incrementally(self, file_path, summary_length='medium'):
+    def summarize_tagged_stream(self, items, summary_length='medium'):
+        """
+        Summarizes a stream of tagged chunks on the shared inference scheduler.
+
+        Chunks of consecutive pages and files are submitted ahead of the consumer,
+        so the model stays busy across page and file boundaries. Closing the generator
+        cancels the submitted chunks that have not started yet.
+
+        :param items: An iterable of (tag, Chunk) pairs. A message string in place of a Chunk is passed through.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :yield: (tag, summary) pairs in the order the items were given.
+        """
+        if self.batch_size > 1:
+            yield from self.summarize_tagged_batched(items, summary_length)
+            return
+
+        # Submit a bounded window ahead so a lazily assembled stream is not consumed all at once
+        window = self.inference_workers * 2
+        pending = deque()
+        try:
+            for tag, value in items:
+                if isinstance(value, str):
+                    pending.append((tag, value))
+                else:
+                    pending.append((tag, self.inference_pool.submit(self.summarize_chunk, value, summary_length)))
+                if len(pending) >= window:
+                    yield self._resolve(pending.popleft())
+            while pending:
+                yield self._resolve(pending.popleft())  # Yield each summarized chunk in order
+        finally:
+            # If the consumer stops early, chunks that have not started are dropped
+            for _, value in pending:
+                if not isinstance(value, str):
+                    value.cancel()
+
+    def _resolve(self, item):
+        """
+        Waits for a submitted summary.
+
+        :param item: A (tag, future or message string) pair.
+        :return: A (tag, summary) pair.
+        """
+        tag, value = item
+        return tag, value if isinstance(value, str) else value.result()
+
+    def summarize_file_hierarchical(self, file_path, summary_length='medium', target_tokens=None, max_rounds=3):
+        """
+        Summarizes a file into a single summary by repeatedly summarizing groups of chunk summaries.
+
+        The chunk summaries of the file are packed into groups that fill the model's
+        token budget, and each group is summarized again, until the combined summary
+        fits target_tokens or max_rounds reduction rounds have run.
+
+        :param file_path: The path to the file to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :param target_tokens: The maximum length of the final summary in tokens. Defaults to one model input.
+        :param max_rounds: The maximum number of reduction rounds after the chunk summaries.
+        :return: The final summary.
+        """
+        target_tokens = target_tokens or self.max_input_tokens
+        summaries = [summary for summary in self.summarize_file_incrementally(file_path, summary_length) if summary]
+        if len(summaries) == 1 and summaries[0].startswith(("Error reading file:", "Unsupported file format.")):
+            return summaries[0]
+
+        previous_tokens = None
+        for round_number in range(1, max_rounds + 1):
+            groups = self.chunker.chunk_text(" ".join(summaries))
+            total_tokens = sum(len(group) for group in groups)
+            if total_tokens <= target_tokens:
+                break
+            if previous_tokens is not None and total_tokens >= previous_tokens:
+                print("Hierarchical summarization stopped shrinking the text.")
+                break
+            print(f"Reduction round {round_number}: {len(summaries)} summaries in {len(groups)} groups, {total_tokens} tokens")
+            summaries = [summary for summary in self.summarize_chunk_stream(groups, summary_length) if summary]
+            previous_tokens = total_tokens
+
+        return " ".join(summaries)
+
+    def summarize_file_incrementally(self, file_path, summary_length='medium', progress_callback=None,
+                                     correct_grammar=False):
         """
         Generates summaries incrementally from a file (PDF, DOCX, TXT).
 
         :param file_path: The path to the file to summarize.
         :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :param progress_callback: Optional callable invoked before each summary is yielded with the number
+            of segments (pages, paragraphs or TXT blocks) summarized so far, matching
+            document_reader.count_document_units.
+        :param correct_grammar: Whether to correct the grammar of each summary, in batches beside inference.
         :yield: Summarized chunks of text.
         """
-        file_type = file_path.split('.')[-1].lower()
+        # Extraction runs ahead of inference, so each chunk is tagged with the number of
+        # segments read when it was assembled, i.e. the last segment it covers
+        extracted = [0]
+
+        def on_segment(units_done):
+            extracted[0] = units_done
+
+        if self.extractive is not None:
+            # Pre-filtering reads the whole document before the first chunk exists, so the
+            # segments are spread over the chunks to keep progress advancing per chunk
+            items = list(self.iter_file_chunks(file_path, on_segment))
+            chunks = ((extracted[0] * (index + 1) // len(items), chunk) for index, (_, chunk) in enumerate(items))
+        else:
+            chunks = ((extracted[0], chunk) for _, chunk in self.iter_file_chunks(file_path, on_segment))
+        stream = self.summarize_tagged_stream(chunks, summary_length)
+        if correct_grammar:
+            stream = self.grammar.correct_stream(stream)
+        for units_done, summary in stream:
+            if progress_callback:
+                progress_callback(units_done)
+            yield summary
+
+    def iter_file_chunks(self, file_path, progress_callback=None, tag=None):
+        """
+        Extracts a file and assembles its chunks, reporting problems as message strings.
 
-        try:
-            # Handle PDF files
-            if file_type == 'pdf':
-                with pdfplumber.open(file_path) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            yield from self.summarize_text_incrementally_generator(page_text, summary_length)
-
-            # Handle DOCX files
-            elif file_type == 'docx':
-                doc = docx.Document(file_path)
-                for para in doc.paragraphs:
-                    para_text = para.text
-                    if para_text:
-                        yield from self.summarize_text_incrementally_generator(para_text, summary_length)
-
-            # Handle TXT files
-            elif file_type == 'txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    while True:
-                        chunk = f.read(2048)  # Read in chunks of 2048 characters
-                        if not chunk:
-                            break
-                        yield from self.summarize_text_incrementally_generator(chunk, summary_length)
+        :param file_path: The path to the file (PDF, DOCX, TXT).
+        :param progress_callback: Optional callable invoked with the number of segments extracted so far.
+        :param tag: The tag paired with every chunk, e.g. the filename.
+        :yield: (tag, Chunk) pairs, or a single (tag, message) pair for unsupported or unreadable files.
+        """
+        if get_file_type(file_path) not in SUPPORTED_FILE_TYPES:
+            yield tag, "Unsupported file format."
+            return
 
+        try:
+            # Chunks are assembled across page and paragraph boundaries, so only the last
+            # chunk of the document can be shorter than the model's token budget
+            segments = self.iter_tracked_segments(file_path, progress_callback)
+            if self.extractive is not None:
+                chunks = self.prefilter_chunks(segments)
             else:
-                yield "Unsupported file format."
+                chunks = self.chunker.iter_chunks(segments)
+            for chunk in chunks:
+                yield tag, chunk
 
         except Exception as e:
             print(f"Error reading file: {e}")
-            yield f"Error reading file: {e}"
+            yield tag, f"Error reading file: {e}"
+
+    def prefilter_chunks(self, segments):
+        """
+        Keeps only the highest ranked sentences of a document, within the configured fraction
+        and token budget, and packs them into chunks in document order.
+
+        Ranking needs the whole document, so its text is collected before the first chunk is built.
+
+        :param segments: An iterable of text segments of one document.
+        :return: A list of Chunk objects.
+        """
+        # Joining first keeps sentences cut by a page boundary whole
+        sentences = self.chunker.split_sentences(" ".join(segment for segment in segments if segment))
+        if not sentences:
+            return []
+
+        with self.metrics.timer('extractive_filter'):
+            ranked = self.extractive.rank(sentences)
+            if not len(ranked):
+                # Nothing to rank, e.g. a document of tables and figures: keep it in document order
+                ranked = list(range(len(sentences)))
+            if self.extractive_ratio:
+                ranked = ranked[:max(1, int(round(len(sentences) * self.extractive_ratio)))]
+        sentence_ids = self.chunker.tokenize_sentences([sentences[index] for index in ranked])
+
+        kept = []
+        total_tokens = 0
+        for index, ids in zip(ranked, sentence_ids):
+            if self.extractive_max_tokens and total_tokens + len(ids) > self.extractive_max_tokens:
+                continue  # A shorter, lower ranked sentence may still fit
+            kept.append((index, ids))
+            total_tokens += len(ids)
+        kept.sort(key=lambda item: item[0])
+
+        self.metrics.increment('extractive_sentences_in', len(sentences))
+        self.metrics.increment('extractive_sentences_kept', len(kept))
+        return self.chunker.pack([sentences[index] for index, _ in kept], [ids for _, ids in kept])
+
+    def iter_tracked_segments(self, file_path, progress_callback=None):
+        """
+        Extracts the segments of a file, reporting each one to a progress callback.
+
+        :param file_path: The path to the file (PDF, DOCX, TXT).
+        :param progress_callback: Optional callable invoked with the number of segments extracted so far.
+        :yield: The text of each page, paragraph or TXT block.
+        """
+        # The document is extracted exactly once, segment by segment
+        self.metrics.increment('files')
+        for units_done, segment_text in enumerate(self.iter_segments(file_path), start=1):
+            self.metrics.increment('segments')
+            if progress_callback:
+                progress_callback(units_done)
+            yield segment_text
+
+    def iter_segments(self, file_path):
+        """
+        Extracts the segments of a file, using the extraction process pool if one is configured
+        and OCRing scanned PDF pages if OCR is enabled.
+
+        :param file_path: The path to the file (PDF, DOCX, TXT).
+        :yield: The text of each page, paragraph or TXT block.
+        """
+        return iter_document_segments(file_path, self.extraction_pool, self.extraction_prefetch, self.metrics,
+                                      self.ocr_options)
+
+    def metrics_report(self):
+        """
+        Returns the timing report of the run so far.
+
+        :return: A dictionary with wall_seconds, per-stage timings (file_open, page_extract, chunk_build,
+            tokenize, generate, grammar_correction, pdf_render) and counters.
+        """
+        return self.metrics.report()
+
+    def write_metrics_report(self, file_path, format='json'):
+        """
+        Saves the timing report of the run so far.
+
+        :param file_path: The path to save the report.
+        :param format: 'json' for a per-run report or 'prometheus' for the Prometheus text format.
+        """
+        if format == 'json':
+            self.metrics.write_json(file_path)
+        elif format == 'prometheus':
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(self.metrics.to_prometheus())
+        else:
+            raise ValueError(f"Unknown metrics format: {format}")
+
+    def reset_metrics(self):
+        """
+        Clears the timing report, e.g. before the next run of a long-lived summarizer.
+        """
+        self.metrics.reset()
+
+    def close(self):
+        """
+        Releases the inference, extraction and grammar workers and the summary cache.
+        """
+        self.inference_pool.shutdown(cancel_futures=True)
+        self.grammar.close()
+        if self.extraction_pool is not None:
+            self.extraction_pool.shutdown(cancel_futures=True)
+            self.extraction_pool = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def iter_folder_summaries(self, folder_path, summary_length='medium', correct_grammar=False):
+        """
+        Streams the summaries of all files in a folder.
+
+        The chunks of all files feed one stream on the inference scheduler, so the next
+        file is already being summarized while the last chunks of the previous one finish.
+
+        :param folder_path: The path to the folder containing files to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :param correct_grammar: Whether to correct the grammar of each summary, in batches beside inference.
+        :yield: (filename, chunk_index, summary) records in file and document order.
+        """
+        def folder_chunks():
+            # scandir streams directory entries instead of listing the whole folder up front
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    print(f"Summarizing {entry.name}...")
+                    yield from self.iter_file_chunks(entry.path, tag=entry.name)
+
+        stream = self.summarize_tagged_stream(folder_chunks(), summary_length)
+        if correct_grammar:
+            stream = self.grammar.correct_stream(stream)
+
+        current_filename = None
+        chunk_index = 0
+        for filename, summary in stream:
+            if filename != current_filename:
+                current_filename, chunk_index = filename, 0
+            yield filename, chunk_index, summary
+            chunk_index += 1
+
+    def summarize_folder_to_sink(self, folder_path, sink, summary_length='medium', correct_grammar=False):
+        """
+        Summarizes all files in a folder, writing each summary to a sink as it is produced.
+
+        :param folder_path: The path to the folder containing files to summarize.
+        :param sink: An object with write(filename, chunk_index, summary), e.g. from result_sinks.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :param correct_grammar: Whether to correct the grammar of each summary before writing it.
+        """
+        for filename, chunk_index, summary in self.iter_folder_summaries(folder_path, summary_length, correct_grammar):
+            sink.write(filename, chunk_index, summary)
 
     def summarize_folder(self, folder_path):
         """
@@ -174,14 +737,20 @@ class PDFSummarizer:
         :param folder_path: The path to the folder containing files to summarize.
         :return: A dictionary with filenames as keys and lists of summarized text as values.
         """
-        summaries = {}
-        for filename in os.listdir(folder_path):
-            print(f"Summarizing {filename}...")
-            file_path = os.path.join(folder_path, filename)
-            for summary in self.summarize_file_incrementally(file_path):
-                print(summary)
-                summaries[filename] = summaries.get(filename, []) + [summary]
-        return summaries
+        with MemorySink() as sink:
+            self.summarize_folder_to_sink(folder_path, sink)
+        return sink.summaries
+
+    def summarize_folder_to_jsonl(self, folder_path, output_file_path, summary_length='medium'):
+        """
+        Summarizes all files in a folder into a JSONL file with one record per summarized chunk.
+
+        :param folder_path: The path to the folder containing files to summarize.
+        :param output_file_path: The path to save the JSONL file.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        """
+        with JsonlSink(output_file_path) as sink:
+            self.summarize_folder_to_sink(folder_path, sink, summary_length)
 
     def summarize_folder_to_pdf(self, folder_path, output_file_path, header, image_path=None):
         """
@@ -192,10 +761,9 @@ class PDFSummarizer:
         :param header: The header text for the PDF.
         :param image_path: Optional path to an image to include in the PDF.
         """
-        summaries = self.summarize_folder(folder_path)
-        combined_text = "\n".join(["\n".join(summaries[filename]) for filename in summaries])
-        corrected_text = self.correct_grammar(combined_text)
-        self.create_beautiful_pdf(output_file_path, corrected_text, header, image_path)
+        # Summaries are corrected and drawn one at a time instead of joining the whole folder first
+        with PdfSink(output_file_path, header, image_path, metrics=self.metrics) as sink:
+            self.summarize_folder_to_sink(folder_path, sink, correct_grammar=True)
 
     def create_beautiful_pdf(self, file_path, text, header, image_path=None):
         """
@@ -206,38 +774,9 @@ class PDFSummarizer:
         :param header: The header text for the PDF.
         :param image_path: Optional path to an image to include in the PDF.
         """
-        c = canvas.Canvas(file_path, pagesize=letter)
-        width, height = letter
-
-        # Add header
-        c.setFont("Helvetica-Bold", 18)
-        c.setFillColorRGB(0.2, 0.4, 0.8)  # Set color for the header
-        c.drawString(1 * inch, height - 1 * inch, header)
-
-        # Optionally add an image
-        if image_path:
-            c.drawImage(image_path, width - 3 * inch, height - 2 * inch, width=2 * inch, height=2 * inch)
-
-        # Add content text
-        c.setFont("Helvetica", 12)
-        c.setFillColorRGB(0, 0, 0)  # Set text color
-        y_position = height - 2 * inch  # Start below header and image
-        max_width = 85  # Adjust for text wrapping
-
-        for paragraph in text.split("\n\n"):  # Treat double newlines as paragraph breaks
-            for line in wrap(paragraph, max_width):
-                if y_position < 1 * inch:  # If reaching the bottom of the page
-                    c.showPage()  # Add a new page
-                    y_position = height - 1 * inch  # Reset position for new page
-                    c.setFont("Helvetica", 12)  # Re-set font for the new page
-                c.drawString(1 * inch, y_position, line)
-                y_position -= 0.3 * inch  # Adjust line spacing
-
-        # Add footer
-        c.setFont("Helvetica-Oblique", 10)
-        c.setFillColorRGB(0.5, 0.5, 0.5)  # Gray color for footer
-        c.drawString(1 * inch, 0.5 * inch, "Generated by AI Text Summarizer")
-        c.save()
+        # Text is wrapped with the font's metrics; reportlab is only imported once a report is written
+        with PdfReportWriter(file_path, header, image_path, metrics=self.metrics) as writer:
+            writer.add_text(text)
 
     def correct_grammar(self, text):
         """
@@ -246,5 +785,4 @@ class PDFSummarizer:
         :param text: The text to be corrected.
         :return: The corrected text.
         """
-        corrected_text = self.tool.correct(text)
-        return corrected_text
+        return self.grammar.correct(text)
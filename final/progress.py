@@ -0,0 +1,98 @@
+import threading
+import time
+
+
+def format_duration(seconds):
+    """
+    Formats a duration for display.
+
+    :param seconds: The duration in seconds.
+    :return: A string such as '1h 02m', '3m 10s' or '42s'.
+    """
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressTracker:
+    """
+    Tracks progress as work units (pages, paragraphs, files) completed out of planned,
+    along with throughput and the estimated time remaining.
+    """
+
+    def __init__(self, total_units=0, unit_name="pages"):
+        """
+        Initializes the ProgressTracker.
+
+        :param total_units: The number of units planned.
+        :param unit_name: The plural name of a unit, used in status messages.
+        """
+        self.total_units = total_units
+        self.unit_name = unit_name
+        self.units_done = 0
+        self.chunks_done = 0
+        self.start_time = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def add_units(self, units):
+        """
+        Adds planned units, e.g. when a folder turns out to hold more files.
+
+        :param units: The number of units to add.
+        """
+        with self.lock:
+            self.total_units += units
+
+    def advance(self, units=0, chunks=0):
+        """
+        Records completed work.
+
+        :param units: The number of units completed.
+        :param chunks: The number of chunks summarized.
+        """
+        with self.lock:
+            self.units_done = min(self.units_done + units, self.total_units) if self.total_units else self.units_done + units
+            self.chunks_done += chunks
+
+    def snapshot(self):
+        """
+        Returns the current progress.
+
+        :return: A dictionary with units_done, total_units, unit_name, percent, chunks_done, elapsed_seconds,
+            units_per_second, chunks_per_second and eta_seconds (None until it can be estimated).
+        """
+        with self.lock:
+            elapsed = time.perf_counter() - self.start_time
+            units_per_second = self.units_done / elapsed if elapsed > 0 else 0.0
+            chunks_per_second = self.chunks_done / elapsed if elapsed > 0 else 0.0
+            remaining = max(0, self.total_units - self.units_done)
+            eta = remaining / units_per_second if units_per_second > 0 else None
+            percent = int(self.units_done * 100 / self.total_units) if self.total_units else 0
+            return {
+                'units_done': self.units_done,
+                'total_units': self.total_units,
+                'unit_name': self.unit_name,
+                'percent': percent,
+                'chunks_done': self.chunks_done,
+                'elapsed_seconds': round(elapsed, 2),
+                'units_per_second': round(units_per_second, 3),
+                'chunks_per_second': round(chunks_per_second, 3),
+                'eta_seconds': round(eta, 1) if eta is not None else None,
+            }
+
+    def format(self):
+        """
+        Formats the current progress as a one-line status message.
+
+        :return: A string such as '45% - 12/30 pages, 0.8 pages/s, 1.2 chunks/s, ETA 3m 10s'.
+        """
+        snapshot = self.snapshot()
+        eta = format_duration(snapshot['eta_seconds']) if snapshot['eta_seconds'] is not None else "estimating"
+        return (f"{snapshot['percent']}% - {snapshot['units_done']}/{snapshot['total_units']} {self.unit_name}, "
+                f"{snapshot['units_per_second']:.2f} {self.unit_name}/s, "
+                f"{snapshot['chunks_per_second']:.2f} chunks/s, ETA {eta}")
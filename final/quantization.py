@@ -0,0 +1,92 @@
+import os
+import torch
+import transformers
+from transformers import AutoConfig, AutoModelForSeq2SeqLM, GenerationConfig
+
+QUANTIZED_MODEL_FILE = 'model.int8.pt'
+MODEL_WEIGHTS_FILE = 'model.safetensors'
+GENERATION_CONFIG_FILE = 'generation_config.json'
+
+
+def quantized_model_path(model_path):
+    """
+    Returns the path of the cached int8 model for a model directory.
+
+    :param model_path: The model directory.
+    :return: The path of the cached quantized model.
+    """
+    return os.path.join(model_path, QUANTIZED_MODEL_FILE)
+
+
+def source_signature(model_path):
+    """
+    Identifies the fp32 weights and the torch and transformers builds a cached quantized model was made from.
+
+    :param model_path: The model directory.
+    :return: A dictionary that must match for the cache to be reused.
+    """
+    weights_path = os.path.join(model_path, MODEL_WEIGHTS_FILE)
+    weights_mtime = os.path.getmtime(weights_path) if os.path.exists(weights_path) else None
+    return {'weights_mtime': weights_mtime, 'torch_version': torch.__version__,
+            'transformers_version': transformers.__version__}
+
+
+def quantize_model(model):
+    """
+    Applies dynamic int8 quantization to the linear layers of a model.
+
+    :param model: The fp32 seq2seq model.
+    :return: The quantized model, for CPU inference.
+    """
+    model = model.to('cpu').eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def build_quantized_model(model_path):
+    """
+    Builds the quantized architecture of a model with untrained weights, ready for a cached state dict.
+
+    :param model_path: The model directory.
+    :return: The quantized model.
+    """
+    model = AutoModelForSeq2SeqLM.from_config(AutoConfig.from_pretrained(model_path))
+    if os.path.exists(os.path.join(model_path, GENERATION_CONFIG_FILE)):
+        # from_config only derives generation defaults from the model config
+        model.generation_config = GenerationConfig.from_pretrained(model_path)
+    return quantize_model(model)
+
+
+def load_quantized_model(model_path):
+    """
+    Loads the int8 model of a model directory, quantizing and caching it on first use.
+
+    Later starts rebuild the quantized architecture from the model's config and load the
+    cached int8 weights into it, without reading the fp32 weights.
+
+    :param model_path: The model directory.
+    :return: The quantized model.
+    """
+    cache_path = quantized_model_path(model_path)
+    signature = source_signature(model_path)
+
+    if os.path.exists(cache_path):
+        try:
+            # Only tensors are stored, so a cache on a shared drive cannot run code when loaded
+            payload = torch.load(cache_path, map_location='cpu', weights_only=True)
+            if payload.get('signature') == signature:
+                quantized = build_quantized_model(model_path)
+                quantized.load_state_dict(payload['state_dict'])
+                print(f"Loaded quantized model from {cache_path}")
+                return quantized.eval()
+            print("Quantized model cache is stale, re-quantizing.")
+        except Exception as e:
+            print(f"Error loading quantized model cache: {e}")
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+    quantized = quantize_model(model)
+    try:
+        torch.save({'state_dict': quantized.state_dict(), 'signature': signature}, cache_path)
+        print(f"Saved quantized model to {cache_path}")
+    except Exception as e:
+        print(f"Error saving quantized model cache: {e}")
+    return quantized
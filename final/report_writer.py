@@ -0,0 +1,133 @@
+from instrumentation import stage_timer
+
+
+def wrap_text(text, max_width, font_name, font_size):
+    """
+    Wraps text into lines that fit a width, measured with the font's metrics.
+
+    :param text: The text to wrap.
+    :param max_width: The maximum line width in points.
+    :param font_name: The font the text is drawn in.
+    :param font_size: The font size in points.
+    :return: A list of lines.
+    """
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    space_width = stringWidth(" ", font_name, font_size)
+    lines = []
+    line = []
+    line_width = 0
+    for word in text.split():
+        word_width = stringWidth(word, font_name, font_size)
+        if word_width > max_width:
+            # A word wider than the line (e.g. a URL) is broken across lines
+            if line:
+                lines.append(" ".join(line))
+                line, line_width = [], 0
+            piece = ""
+            for char in word:
+                if piece and stringWidth(piece + char, font_name, font_size) > max_width:
+                    lines.append(piece)
+                    piece = ""
+                piece += char
+            word, word_width = piece, stringWidth(piece, font_name, font_size)
+        if line and line_width + space_width + word_width > max_width:
+            lines.append(" ".join(line))
+            line, line_width = [], 0
+        line_width += (space_width if line else 0) + word_width
+        line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+class PdfReportWriter:
+    """
+    Flows text onto PDF pages as it arrives and finalizes the file on close.
+
+    Each finished page is compressed straight away, so memory grows with the
+    compressed size of the report rather than with the text of the summaries.
+    """
+
+    def __init__(self, file_path, header, image_path=None, font_name="Helvetica", font_size=12, metrics=None):
+        """
+        Initializes the PdfReportWriter and draws the header.
+
+        :param file_path: The path of the PDF to write.
+        :param header: The header text for the PDF.
+        :param image_path: Optional path to an image to include in the PDF.
+        :param font_name: The font of the body text.
+        :param font_size: The font size of the body text in points.
+        :param metrics: Optional PipelineMetrics receiving the pdf_render timings.
+        """
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.units import inch
+        from reportlab.pdfgen import canvas
+
+        self.inch = inch
+        self.width, self.height = letter
+        self.font_name = font_name
+        self.font_size = font_size
+        self.metrics = metrics
+        self.max_line_width = self.width - 2 * inch  # One inch margins on both sides
+        self.line_spacing = 0.3 * inch
+        self.canvas = canvas.Canvas(file_path, pagesize=letter, pageCompression=1)
+
+        with stage_timer(metrics, 'pdf_render'):
+            # Add header
+            self.canvas.setFont("Helvetica-Bold", 18)
+            self.canvas.setFillColorRGB(0.2, 0.4, 0.8)  # Set color for the header
+            self.canvas.drawString(1 * inch, self.height - 1 * inch, header)
+
+            # Optionally add an image
+            if image_path:
+                self.canvas.drawImage(image_path, self.width - 3 * inch, self.height - 2 * inch,
+                                      width=2 * inch, height=2 * inch)
+
+            self.canvas.setFont(font_name, font_size)
+            self.canvas.setFillColorRGB(0, 0, 0)  # Set text color
+            self.y_position = self.height - 2 * inch  # Start below header and image
+
+    def add_paragraph(self, text):
+        """
+        Draws a paragraph below the previous one, starting new pages as needed.
+
+        :param text: The text of the paragraph.
+        """
+        inch = self.inch
+        with stage_timer(self.metrics, 'pdf_render'):
+            for line in wrap_text(text, self.max_line_width, self.font_name, self.font_size):
+                if self.y_position < 1 * inch:  # If reaching the bottom of the page
+                    self.canvas.showPage()  # Add a new page
+                    self.y_position = self.height - 1 * inch  # Reset position for new page
+                    self.canvas.setFont(self.font_name, self.font_size)  # Re-set font for the new page
+                self.canvas.drawString(1 * inch, self.y_position, line)
+                self.y_position -= self.line_spacing
+
+    def add_text(self, text):
+        """
+        Draws text, treating double newlines as paragraph breaks.
+
+        :param text: The text to draw.
+        """
+        for paragraph in text.split("\n\n"):
+            self.add_paragraph(paragraph)
+
+    def close(self):
+        """
+        Draws the footer and saves the PDF.
+        """
+        if self.canvas is None:
+            return
+        with stage_timer(self.metrics, 'pdf_render'):
+            self.canvas.setFont("Helvetica-Oblique", 10)
+            self.canvas.setFillColorRGB(0.5, 0.5, 0.5)  # Gray color for footer
+            self.canvas.drawString(1 * self.inch, 0.5 * self.inch, "Generated by AI Text Summarizer")
+            self.canvas.save()
+        self.canvas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,103 @@
+import json
+
+from report_writer import PdfReportWriter
+
+
+class MemorySink:
+    """
+    Collects summaries in memory as a dictionary of filename to list of summaries.
+    """
+
+    def __init__(self):
+        self.summaries = {}
+
+    def write(self, filename, chunk_index, summary):
+        """
+        Appends a summary to the list of its file.
+
+        :param filename: The name of the summarized file.
+        :param chunk_index: The index of the chunk within the file.
+        :param summary: The summarized text.
+        """
+        self.summaries.setdefault(filename, []).append(summary)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JsonlSink:
+    """
+    Appends each summary as one JSON line to a file.
+    """
+
+    def __init__(self, file_path):
+        """
+        Initializes the JsonlSink.
+
+        :param file_path: The path of the JSONL file to write.
+        """
+        self.file = open(file_path, 'w', encoding='utf-8')
+
+    def write(self, filename, chunk_index, summary):
+        """
+        Writes a summary record.
+
+        :param filename: The name of the summarized file.
+        :param chunk_index: The index of the chunk within the file.
+        :param summary: The summarized text.
+        """
+        self.file.write(json.dumps({'filename': filename, 'chunk_index': chunk_index, 'summary': summary}) + "\n")
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PdfSink:
+    """
+    Draws each summary onto a PDF as it arrives, so the combined text is never held in memory.
+    """
+
+    def __init__(self, file_path, header, image_path=None, metrics=None):
+        """
+        Initializes the PdfSink and draws the header.
+
+        :param file_path: The path of the PDF to write.
+        :param header: The header text for the PDF.
+        :param image_path: Optional path to an image to include in the PDF.
+        :param metrics: Optional PipelineMetrics receiving the pdf_render timings.
+        """
+        self.writer = PdfReportWriter(file_path, header, image_path, metrics=metrics)
+
+    def write(self, filename, chunk_index, summary):
+        """
+        Draws a summary below the previous one.
+
+        :param filename: The name of the summarized file.
+        :param chunk_index: The index of the chunk within the file.
+        :param summary: The summarized text.
+        """
+        self.writer.add_paragraph(summary)
+
+    def close(self):
+        """
+        Draws the footer and saves the PDF.
+        """
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,43 @@
+import json
+import time
+
+
+class StartupReport:
+    """
+    Records cold-start milestones relative to process start.
+    """
+
+    def __init__(self, start_time=None):
+        """
+        Initializes the StartupReport.
+
+        :param start_time: The time.perf_counter() value taken at process start.
+        """
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self.milestones = {}
+
+    def mark(self, name):
+        """
+        Records a milestone as the seconds elapsed since process start.
+
+        :param name: The name of the milestone, e.g. 'window_shown'.
+        """
+        self.milestones[name] = round(time.perf_counter() - self.start_time, 3)
+        print(f"Startup: {name} after {self.milestones[name]:.3f}s")
+
+    def report(self):
+        """
+        Returns the recorded milestones.
+
+        :return: A dictionary of milestone names to seconds since process start.
+        """
+        return dict(self.milestones)
+
+    def write(self, file_path):
+        """
+        Writes the recorded milestones to a JSON file.
+
+        :param file_path: The path of the JSON report.
+        """
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+TOUCH_BATCH_SIZE = 256  # Cache hits whose last_used update is written in one statement
+EVICTION_BATCH_SIZE = 256  # Least recently used rows inspected per eviction step
+LOW_WATER_FRACTION = 0.9  # Eviction frees space down to this fraction of max_bytes
+
+
+class SummaryCache:
+    """
+    A persistent, size-bounded LRU cache of chunk summaries stored in SQLite.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024):
+        """
+        Initializes the SummaryCache.
+
+        :param cache_dir: The directory holding the cache database.
+        :param max_bytes: The maximum total size of cached summaries before the least recently used are evicted.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "summaries.sqlite3")
+        self.max_bytes = max_bytes
+        self.low_water_bytes = int(max_bytes * LOW_WATER_FRACTION)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.pending_touches = {}  # key -> last_used of hits not yet written
+
+        # Summaries are looked up from the inference worker threads
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL with normal sync makes each commit an append instead of a full fsync of the database
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, summary TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS summaries_last_used ON summaries (last_used)")
+        # The running total lives in the database, so every process sharing the cache sees the same size
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL)"
+        )
+        self.connection.execute(
+            "INSERT OR IGNORE INTO cache_size (id, total_bytes) SELECT 0, COALESCE(SUM(size), 0) FROM summaries"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(text, model_path, generation_params, summary_length):
+        """
+        Builds the cache key for a chunk.
+
+        :param text: The chunk text.
+        :param model_path: The path of the model producing the summary.
+        :param generation_params: A dictionary of generation parameters.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: A hex digest identifying the summary.
+        """
+        normalized_text = " ".join(text.split())
+        payload = json.dumps(
+            [normalized_text, model_path, generation_params, summary_length], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Looks up a cached summary and marks it as recently used.
+
+        The last_used update is buffered and written in batches, so a hit costs a single indexed read.
+
+        :param key: The cache key.
+        :return: The cached summary, or None on a miss.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.pending_touches[key] = time.time()
+            if len(self.pending_touches) >= TOUCH_BATCH_SIZE:
+                self._flush_touches()
+                self.connection.commit()
+            return row[0]
+
+    def put(self, key, summary):
+        """
+        Stores a summary and evicts the least recently used entries if the cache is over budget.
+
+        :param key: The cache key.
+        :param summary: The summary to store.
+        """
+        size = len(summary.encode("utf-8"))
+        with self.lock:
+            # Take the write lock first, so the total read below cannot change before the commit
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                previous = self.connection.execute("SELECT size FROM summaries WHERE key = ?", (key,)).fetchone()
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO summaries (key, summary, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, summary, size, time.time()),
+                )
+                self.pending_touches.pop(key, None)
+                self._add_bytes(size - (previous[0] if previous else 0))
+                total_bytes = self._total_bytes()
+                if total_bytes > self.max_bytes:
+                    self._evict(total_bytes)
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+
+    def _total_bytes(self):
+        """
+        Reads the total size of the cached summaries, as recorded by all processes.
+
+        :return: The size in bytes.
+        """
+        return self.connection.execute("SELECT total_bytes FROM cache_size WHERE id = 0").fetchone()[0]
+
+    def _add_bytes(self, delta):
+        """
+        Adjusts the recorded total size in the current transaction.
+
+        :param delta: The number of bytes added, negative for removed bytes.
+        """
+        self.connection.execute("UPDATE cache_size SET total_bytes = total_bytes + ? WHERE id = 0", (delta,))
+
+    def _flush_touches(self):
+        """
+        Writes the buffered last_used updates of cache hits.
+        """
+        if self.pending_touches:
+            self.connection.executemany(
+                "UPDATE summaries SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self.pending_touches.items()],
+            )
+            self.pending_touches.clear()
+
+    def _evict(self, total_bytes):
+        """
+        Deletes least recently used entries until the cache is down to its low-water mark,
+        so the next evictions are many puts away.
+
+        :param total_bytes: The current total size of the cache.
+        """
+        # Recent hits must be recorded before choosing what is least recently used
+        self._flush_touches()
+        while total_bytes > self.low_water_bytes:
+            rows = self.connection.execute(
+                "SELECT size FROM summaries ORDER BY last_used, key LIMIT ?", (EVICTION_BATCH_SIZE,)
+            ).fetchall()
+            if not rows:
+                self._add_bytes(-total_bytes)  # The table is empty; repair a drifted total
+                break
+            count = 0
+            freed = 0
+            for (size,) in rows:
+                if total_bytes - freed <= self.low_water_bytes:
+                    break
+                count += 1
+                freed += size
+            self.connection.execute(
+                "DELETE FROM summaries WHERE key IN "
+                "(SELECT key FROM summaries ORDER BY last_used, key LIMIT ?)",
+                (count,),
+            )
+            self._add_bytes(-freed)
+            total_bytes -= freed
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        :return: A dictionary with hits, misses, entries and bytes.
+        """
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            size = self._total_bytes()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self):
+        """
+        Closes the cache database.
+        """
+        with self.lock:
+            self._flush_touches()
+            self.connection.commit()
+            self.connection.close()
@@ -0,0 +1,280 @@
+"""
+Local HTTP summarization server sharing one warm model between users and processes.
+
+Requests are split into chunks, and chunks from concurrent requests are merged
+into micro-batches within a short time window. Summaries are streamed back as
+newline-delimited JSON while they are produced.
+
+Endpoints:
+    POST /summarize                       JSON body {"text": "...", "summary_length": "medium"}
+    POST /summarize?filename=report.pdf   Raw PDF/DOCX/TXT bytes; summary_length may be passed in the query
+    GET  /health                          Server and cache status
+    GET  /metrics                         Per-stage timings in the Prometheus text format
+
+Usage:
+    python summary_server.py [--host 127.0.0.1] [--port 8765] [--model model] [--max-batch-size 8] [--max-wait-ms 20]
+"""
+import argparse
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from document_reader import SUPPORTED_FILE_TYPES, get_file_type
+
+SUMMARY_LENGTHS = ('small', 'medium', 'large')
+REQUEST_WINDOW = 16  # Chunks of one request queued ahead of the response stream
+
+
+class MicroBatcher:
+    """
+    Merges chunks submitted by concurrent requests into batched generate calls.
+    """
+
+    def __init__(self, summarizer, max_batch_size=8, max_wait=0.02):
+        """
+        Initializes the MicroBatcher and starts its worker thread.
+
+        :param summarizer: A loaded PDFSummarizer.
+        :param max_batch_size: The maximum number of chunks per generate call.
+        :param max_wait: The number of seconds to wait for more chunks after the first one arrives.
+        """
+        self.summarizer = summarizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.chunks = 0
+        self.thread = threading.Thread(target=self.run, name="micro-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, chunk, summary_length='medium'):
+        """
+        Queues a chunk for summarization.
+
+        :param chunk: The Chunk to summarize.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        :return: A Future resolving to the summary.
+        """
+        future = Future()
+        self.queue.put((chunk, summary_length, future))
+        return future
+
+    def collect(self):
+        """
+        Waits for a chunk, then gathers more until the batch is full or the time window closes.
+
+        :return: A list of (chunk, summary_length, future) entries.
+        """
+        entries = [self.queue.get()]
+        # The window is measured from the first chunk, not reset by each new arrival
+        deadline = time.monotonic() + self.max_wait
+        while len(entries) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entries.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return entries
+
+    def run(self):
+        """
+        Summarizes micro-batches until the process exits.
+        """
+        while True:
+            # Skip chunks whose request was cancelled by a disconnected client
+            entries = [entry for entry in self.collect() if entry[2].set_running_or_notify_cancel()]
+            # Chunks can only share a generate call if they ask for the same summary length
+            groups = {}
+            for entry in entries:
+                groups.setdefault(entry[1], []).append(entry)
+            for summary_length, group in groups.items():
+                group.sort(key=lambda entry: len(entry[0]))
+                try:
+                    summaries = self.summarizer.summarize_batch([entry[0] for entry in group], summary_length)
+                except Exception as e:
+                    for _, _, future in group:
+                        future.set_exception(e)
+                    continue
+                for (_, _, future), summary in zip(group, summaries):
+                    future.set_result(summary)
+                self.batches += 1
+                self.chunks += len(group)
+
+
+class SummaryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles summarization requests, streaming results as newline-delimited JSON.
+    """
+    protocol_version = "HTTP/1.1"  # Needed for chunked transfer encoding
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        summarizer = self.server.summarizer
+        if path == '/metrics':
+            body = summarizer.metrics.to_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4'
+        elif path == '/health':
+            body = json.dumps({
+                'status': 'ok',
+                'model': summarizer.model_path,
+                'batches': self.server.batcher.batches,
+                'chunks': self.server.batcher.chunks,
+                'cache': summarizer.cache_stats(),
+            }).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/summarize':
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        temp_path = None
+
+        try:
+            if 'filename' in query:
+                filename = query['filename'][0]
+                summary_length = query.get('summary_length', ['medium'])[0]
+                if get_file_type(filename) not in SUPPORTED_FILE_TYPES:
+                    self.send_error(415, "Unsupported file format.")
+                    return
+                # Extraction needs a real file on disk
+                with tempfile.NamedTemporaryFile(suffix='.' + get_file_type(filename), delete=False) as f:
+                    f.write(body)
+                    temp_path = f.name
+                items = self.server.summarizer.iter_file_chunks(temp_path)
+            else:
+                try:
+                    request = json.loads(body or b'{}')
+                    text = request['text']
+                except (ValueError, KeyError):
+                    self.send_error(400, 'Expected a JSON body with a "text" field.')
+                    return
+                summary_length = request.get('summary_length', 'medium')
+                items = ((None, chunk) for chunk in self.server.summarizer.chunker.iter_chunks([text]))
+
+            if summary_length not in SUMMARY_LENGTHS:
+                self.send_error(400, f"summary_length must be one of {', '.join(SUMMARY_LENGTHS)}.")
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self.stream_summaries(items, summary_length)
+        finally:
+            if temp_path:
+                os.remove(temp_path)
+
+    def stream_summaries(self, items, summary_length):
+        """
+        Submits the chunks of a request to the micro-batcher and streams their summaries in order.
+
+        :param items: An iterable of (tag, Chunk or message string) pairs.
+        :param summary_length: The desired length of the summary ('small', 'medium', 'large').
+        """
+        pending = deque()
+        index = 0
+        try:
+            for _, value in items:
+                pending.append(value if isinstance(value, str) else self.server.batcher.submit(value, summary_length))
+                while len(pending) >= REQUEST_WINDOW or (pending and self._ready(pending[0])):
+                    self.write_record({'index': index, 'summary': self._result(pending.popleft())})
+                    index += 1
+            while pending:
+                self.write_record({'index': index, 'summary': self._result(pending.popleft())})
+                index += 1
+            self.write_record({'done': True, 'chunks': index})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; drop the chunks it no longer needs
+            for value in pending:
+                if isinstance(value, Future):
+                    value.cancel()
+        except Exception as e:
+            self.write_record({'error': str(e)})
+            self.wfile.write(b"0\r\n\r\n")
+
+    def _ready(self, value):
+        return isinstance(value, str) or value.done()
+
+    def _result(self, value):
+        return value if isinstance(value, str) else value.result()
+
+    def write_record(self, record):
+        """
+        Writes one NDJSON record as an HTTP chunk.
+
+        :param record: The dictionary to send.
+        """
+        data = (json.dumps(record) + "\n").encode('utf-8')
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+
+class SummaryServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server holding one warm PDFSummarizer and its micro-batcher.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, summarizer, max_batch_size=8, max_wait=0.02):
+        """
+        Initializes the SummaryServer.
+
+        :param address: The (host, port) to listen on.
+        :param summarizer: A loaded PDFSummarizer.
+        :param max_batch_size: The maximum number of chunks per generate call.
+        :param max_wait: The number of seconds to wait for more chunks to fill a batch.
+        """
+        super().__init__(address, SummaryRequestHandler)
+        self.summarizer = summarizer
+        self.batcher = MicroBatcher(summarizer, max_batch_size, max_wait)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve summaries from one shared, warm model.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--model', default='model', help="Model directory.")
+    parser.add_argument('--max-batch-size', type=int, default=8, help="Maximum chunks per generate call.")
+    parser.add_argument('--max-wait-ms', type=float, default=20, help="Time window for merging concurrent chunks.")
+    parser.add_argument('--cache-dir', help="Optional directory for the persistent summary cache.")
+    parser.add_argument('--quantize', action='store_true', help="Use the dynamic int8 model.")
+    parser.add_argument('--backend', default='torch', choices=['torch', 'onnx'])
+    args = parser.parse_args()
+
+    from pdf_summariser_class import PDFSummarizer
+    summarizer = PDFSummarizer(model_name=args.model, cache_dir=args.cache_dir, quantize=args.quantize, backend=args.backend)
+
+    server = SummaryServer((args.host, args.port), summarizer, args.max_batch_size, args.max_wait_ms / 1000)
+    print(f"Serving summaries on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        summarizer.close()
+
+
+if __name__ == '__main__':
+    main()
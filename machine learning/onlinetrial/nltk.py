@@ -3,19 +3,20 @@
 """pdfSummarizer.py: This script summarizes text provided in a PDF file."""
 
 import os
+import sys
 import nltk
 import pytesseract
 import re
 import slate3k as slate
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
+from nltk.tokenize import sent_tokenize
 from nltk.stem.snowball import SnowballStemmer
-from PIL import Image
-nltk.download("stopwords")
-nltk.download("punkt")
-nltk.download("punkt_tab")
-# nltk.download("all")
+
+# The extractive engine lives in final/ and is shared with the desktop app. The folder is appended,
+# so installed packages still take precedence over the app's modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "final"))
+from extractive import ExtractiveSummarizer
 
 # Extract text from PDF file using slate
 def extractText(file):
@@ -29,99 +30,68 @@ def extractText(file):
     return text
 
 
-def extractOCR(file):
-    pages = convert_from_path(file, 500)
-
-    image_counter = 1
-    for page in pages:
-        filename = "page_" + str(image_counter) + ".jpg"
-        page.save(filename, "JPEG")
-        image_counter = image_counter + 1
-
-    limit = image_counter-1
+def extractOCR(file, dpi=300):
+    # Render and OCR one page at a time in memory, instead of writing every page to a JPEG first
+    pageCount = pdfinfo_from_path(file)["Pages"]
     text = ""
-    for i in range(1, limit + 1):
-        filename = "page_" + str(i) + ".jpg"
-        page = str(((pytesseract.image_to_string(Image.open(filename)))))
-        page = page.replace("-\n", "")
-        text += page
-        os.remove(filename)
+    for pageNumber in range(1, pageCount + 1):
+        image = convert_from_path(file, dpi, first_page=pageNumber, last_page=pageNumber)[0]
+        page = pytesseract.image_to_string(image)
+        image.close()
+        text += page.replace("-\n", "")
     return text
 
 
-def summarize(text):
-    # Process text by removing numbers and unrecognized punctuation
-    processedText = re.sub("’", "'", text)
-    processedText = re.sub("[^a-zA-Z' ]+", " ", processedText)
-    stopWords = set(stopwords.words("english"))
-    words = word_tokenize(processedText)
-
-    # Normalize words with Porter stemming and build word frequency table
-    stemmer = SnowballStemmer("english", ignore_stopwords=True)
-    freqTable = dict()
-    for word in words:
-        word = word.lower()
-        if word in stopWords:
-            continue
-        elif stemmer.stem(word) in freqTable:
-            freqTable[stemmer.stem(word)] += 1
-        else:
-            freqTable[stemmer.stem(word)] = 1
-
-    # Normalize every sentence in the text
-    sentences = sent_tokenize(text)
-    stemmedSentences = []
-    sentenceValue = dict()
-    for sentence in sentences:
-        stemmedSentence = []
-        for word in sentence.lower().split():
-            stemmedSentence.append(stemmer.stem(word))
-        stemmedSentences.append(stemmedSentence)
-
-    # Calculate value of every normalized sentence based on word frequency table
-    # [:12] helps to save space
-    for num in range(len(stemmedSentences)):
-        for wordValue in freqTable:
-            if wordValue in stemmedSentences[num]:
-                if sentences[num][:12] in sentenceValue:
-                    sentenceValue[sentences[num][:12]] += freqTable.get(wordValue)
-                else:
-                    sentenceValue[sentences[num][:12]] = freqTable.get(wordValue)
-
-    # Determine average value of a sentence in the text
-    sumValues = 0
-    for sentence in sentenceValue:
-        sumValues += sentenceValue.get(sentence)
-
-    average = int(sumValues / len(sentenceValue))
-
-    # Create summary of text using sentences that exceed the average value by some factor
+_engine = None
+
+
+def getEngine():
+    # Build the extractive engine once, downloading the NLTK data it needs on first use
+    global _engine
+    if _engine is None:
+        for resource, package in (("corpora/stopwords", "stopwords"), ("tokenizers/punkt", "punkt"),
+                                  ("tokenizers/punkt_tab", "punkt_tab")):
+            try:
+                nltk.data.find(resource)
+            except LookupError:
+                nltk.download(package)
+        stemmer = SnowballStemmer("english", ignore_stopwords=True)
+        _engine = ExtractiveSummarizer(stemmer=stemmer.stem, stop_words=stopwords.words("english"),
+                                       sentence_splitter=sent_tokenize)
+    return _engine
+
+
+def summarize(text, factor=3.0):
+    # Keep sentences whose score exceeds the average by some factor
     # This factor can be adjusted to reduce/expand the length of the summary
-    summary = ""
-    for sentence in sentences:
-            if sentence[:12] in sentenceValue and sentenceValue[sentence[:12]] > (3.0 * average):
-                summary += " " + " ".join(sentence.split())
-                print(sentence)
+    summary = getEngine().summarize(text, threshold=factor)
 
-    # Process the text in summary and write it to a new file
+    # Remove characters the summary file should not contain
     summary = re.sub("’", "'", summary)
     summary = re.sub("[^a-zA-Z0-9'\"():;,.!?— ]+", " ", summary)
-    summaryText = open(fileName + "Summary.txt", "w")
-    summaryText.write(summary)
-    summaryText.close()
-
-
-# Scan user input for PDF file name
-print("What is the name of the PDF?")
-fileName = input("(Without .pdf file extension)\n")
-pdfFileName = fileName + ".pdf"
-option = input("Direct text extraction or OCR extraction? (text / OCR)\n")
-
-if option == "text":
-    text = extractText(pdfFileName)
-    summarize(text)
-elif option == "OCR":
-    text = extractOCR(pdfFileName)
-    summarize(text)
-else:
-    print("Not a valid option!")
+    return summary
+
+
+def main():
+    # Scan user input for PDF file name
+    print("What is the name of the PDF?")
+    fileName = input("(Without .pdf file extension)\n")
+    pdfFileName = fileName + ".pdf"
+    option = input("Direct text extraction or OCR extraction? (text / OCR)\n")
+
+    if option == "text":
+        text = extractText(pdfFileName)
+    elif option == "OCR":
+        text = extractOCR(pdfFileName)
+    else:
+        print("Not a valid option!")
+        return
+
+    summary = summarize(text)
+    print(summary)
+    with open(fileName + "Summary.txt", "w") as summaryText:
+        summaryText.write(summary)
+
+
+if __name__ == "__main__":
+    main()